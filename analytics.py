@@ -0,0 +1,103 @@
+# analytics.py
+import datetime
+
+import numpy as np
+import pandas as pd
+
+
+def to_utc_ns(values):
+    """Parses timestamps into a naive UTC datetime64[ns] array."""
+    return pd.to_datetime(values, utc=True, format="ISO8601").dt.tz_convert(None).to_numpy("datetime64[ns]")
+
+
+def depletion_matrix(history, depletions):
+    """Splits depletion events into consecutive truck-to-truck windows.
+
+    `history` has one row per truck closure (`truck_id`, `closed_at`) and
+    `depletions` one row per depleted unit (`item_code`, `depleted_at`).
+    Each depletion is counted against the latest closure at or before it, so
+    a truck's window runs from its `closed_at` up to the next truck's. Rows
+    depleted before the first closure are not attributed to any truck.
+
+    Returns a truck x item count matrix indexed like `history`, sorted by
+    `closed_at`.
+    """
+    closures = history.sort_values("closed_at", kind="stable")
+    if depletions.empty or closures.empty:
+        return pd.DataFrame(index=closures.index, dtype="int64")
+
+    depletions = depletions[depletions["depleted_at"].notna()]
+    closed = to_utc_ns(closures["closed_at"])
+    depleted = to_utc_ns(depletions["depleted_at"])
+
+    # One sorted merge: position of the closure each depletion falls after
+    window = np.searchsorted(closed, depleted, side="right") - 1
+    keep = window >= 0
+    codes, items = pd.factorize(depletions["item_code"].to_numpy()[keep], sort=True)
+
+    n_trucks, n_items = len(closures), len(items)
+    counts = np.bincount(
+        window[keep] * n_items + codes, minlength=n_trucks * n_items
+    ).reshape(n_trucks, n_items)
+
+    return pd.DataFrame(counts, index=closures.index, columns=items)
+
+
+# Delivery schedule used by the "Create Anticipated Truck" form
+TRUCK_DAYS = ["Monday", "Thursday", "Saturday"]
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+def weekday_of(days):
+    """Monday=0 weekday numbers for a datetime64[D] array (1970-01-01 was a Thursday)."""
+    return (days.astype("int64") + 3) % 7
+
+
+def truck_coverage(schedule=TRUCK_DAYS):
+    """Returns a 7 x len(schedule) mask of the weekdays each truck has to cover.
+
+    A truck supplies its own day and every day until the next scheduled
+    truck, e.g. the Monday truck covers Monday through Wednesday.
+    """
+    starts = [WEEKDAYS.index(day) for day in schedule]
+    ordered = sorted(starts)
+    coverage = np.zeros((7, len(schedule)))
+    for col, start in enumerate(starts):
+        following = ordered[(ordered.index(start) + 1) % len(ordered)]
+        length = (following - start) % 7 or 7
+        coverage[(start + np.arange(length)) % 7, col] = 1
+    return coverage
+
+
+def recommend_quantities(depletions, today=None, lookback_days=365, schedule=TRUCK_DAYS, max_qty=99):
+    """Suggests how many units of each item every scheduled truck should bring.
+
+    Per-item depletion rates are computed for each weekday over the lookback
+    window (or since the first recorded depletion, if that is shorter), then
+    summed over the weekdays each truck covers and rounded up.
+
+    Returns an item x truck day DataFrame of integer quantities.
+    """
+    if depletions.empty:
+        return pd.DataFrame(columns=schedule, dtype="int64")
+
+    end = np.datetime64(pd.Timestamp(today or datetime.date.today()).date(), "D")
+    start = end - np.timedelta64(lookback_days, "D")
+
+    depletions = depletions[depletions["depleted_at"].notna()]
+    days = to_utc_ns(depletions["depleted_at"]).astype("datetime64[D]")
+    keep = (days >= start) & (days < end)
+    if not keep.any():
+        return pd.DataFrame(columns=schedule, dtype="int64")
+    days = days[keep]
+
+    codes, items = pd.factorize(depletions["item_code"].to_numpy()[keep], sort=True)
+    counts = np.bincount(codes * 7 + weekday_of(days), minlength=len(items) * 7).reshape(len(items), 7)
+
+    # How many of each weekday the observed history actually spans
+    observed = np.bincount(weekday_of(np.arange(days.min(), end)), minlength=7)
+    rates = np.divide(counts, observed, out=np.zeros(counts.shape), where=observed > 0)
+
+    demand = rates @ truck_coverage(schedule)
+    quantities = np.clip(np.ceil(demand.round(6)), 0, max_qty).astype("int64")
+    return pd.DataFrame(quantities, index=items, columns=schedule)
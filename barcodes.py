@@ -0,0 +1,110 @@
+# barcodes.py
+"""Barcode images and printable sticker sheets for the Truck pages.
+
+python-barcode (with Pillow behind ImageWriter) and reportlab are imported
+inside the functions, so pages load them only when a label is rendered.
+"""
+import contextlib
+import os
+import tempfile
+from io import BytesIO
+
+
+def generate_barcode_bytes(label_text: str) -> bytes:
+    from barcode import Code128
+    from barcode.writer import ImageWriter
+
+    buf = BytesIO()
+    Code128(label_text, writer=ImageWriter()).write(buf, options={"write_text": True})
+    buf.seek(0)
+    return buf.getvalue()
+
+
+def create_barcode_pdf(barcodes, skip_slots=0):
+    from barcode import Code128
+    from barcode.writer import ImageWriter
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    pdf_buffer = BytesIO()
+    c = canvas.Canvas(pdf_buffer, pagesize=letter)
+    page_w, page_h = letter
+
+    # Layout: 3 columns × 10 rows
+    margin_x = 36
+    col_spacing = 20
+    row_spacing = 15
+    cols = 3
+    rows = 10
+
+    # Size of each sticker
+    sticker_w = (page_w - 2 * margin_x - (cols - 1) * col_spacing) / cols
+    sticker_h = 60  # fixed height for each barcode
+
+    # Compute total grid height for vertical centering
+    grid_height = rows * sticker_h + (rows - 1) * row_spacing
+    margin_y = (page_h - grid_height) / 2
+
+    # START POSITION BASED ON SKIP
+    col = skip_slots % cols
+    row = skip_slots // cols
+    temp_files = []
+
+    try:
+        for label, _ in barcodes:
+            # Generate barcode image in memory
+            barcode_obj = Code128(label, writer=ImageWriter())
+            options = {
+                "module_width": 0.35,
+                "module_height": 18,
+                "write_text": False
+            }
+            barcode_bytes = BytesIO()
+            barcode_obj.write(barcode_bytes, options)
+
+            # Save to a temporary file
+            with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as temp_img:
+                temp_img.write(barcode_bytes.getvalue())
+                temp_filepath = temp_img.name
+                temp_files.append(temp_filepath)
+
+            # Calculate position
+            x_pos = margin_x + col * (sticker_w + col_spacing)
+            y_pos = page_h - margin_y - (row + 1) * sticker_h - row * row_spacing
+
+            # Draw the barcode image
+            c.drawImage(
+                temp_filepath,
+                x_pos,
+                y_pos + 12,  # shift image up to make space for text
+                width=sticker_w,
+                height=sticker_h - 20,
+                preserveAspectRatio=True,
+                anchor='n'
+            )
+
+            # Draw the label under the image
+            c.setFont("Helvetica-Bold", 10)
+            c.drawCentredString(
+                x_pos + sticker_w / 2,
+                y_pos,
+                label
+            )
+
+            # Move to next position
+            col += 1
+            if col >= cols:
+                col = 0
+                row += 1
+                if row >= rows:
+                    c.showPage()
+                    row = 0
+
+        c.save()
+        pdf_buffer.seek(0)
+        return pdf_buffer.getvalue()
+    finally:
+        # Clean up temp files
+        for f in temp_files:
+            with contextlib.suppress(OSError):
+                os.remove(f)
@@ -0,0 +1,120 @@
+# benchmark.py
+"""Concurrent scan throughput benchmark.
+
+Several threads run the User Mode scan path at once (allowed-item check,
+status lookup, compare-and-set status update, version check) through a
+Repository and the total scans per second is reported.
+
+    python benchmark.py                       # SQLite: default settings vs tuned
+    python benchmark.py --backend supabase    # same workload against SUPABASE_URL
+
+The Supabase run writes to the configured project: it adds a throwaway item,
+truck and inventory rows and deletes them again afterwards.
+"""
+import argparse
+import datetime
+import os
+import tempfile
+import threading
+import time
+
+from repository import SQLiteRepository, SupabaseRepository
+
+# Each scan moves a unit one step along its lifecycle, wrapping around so a
+# thread can keep scanning the same slots
+NEXT_STATUS = {"in_stock": "in_use", "in_use": "depleted", "depleted": "in_stock"}
+
+
+def seed(repo, item_code, slots):
+    """Adds one benchmark truck with `slots` in-stock units of `item_code`; returns the truck id."""
+    now = datetime.datetime.now().isoformat()
+    repo.add_allowed_item(item_code)
+    truck_id = repo.create_truck({"truck_name": "benchmark", "created_by": "benchmark", "created_at": now, "status": "closed"})
+    for slot in range(1, slots + 1):
+        repo.add_inventory_item({
+            "item_code": item_code,
+            "slot": slot,
+            "status": "in_stock",
+            "added_by": "benchmark",
+            "added_at": now,
+            "in_stock_at": now,
+            "truck_id": truck_id,
+        })
+    return truck_id
+
+
+def scan(repo, item_code, slot):
+    if not repo.is_allowed_item(item_code):
+        raise RuntimeError(f"{item_code} is not an allowed item")
+    status = repo.get_item_status(item_code, slot)
+    new_status = NEXT_STATUS[status]
+    if not repo.transition_inventory_item(item_code, slot, new_status, status, datetime.datetime.now().isoformat()):
+        raise RuntimeError(f"{item_code}_{slot} changed status during the benchmark")
+    repo.data_versions()
+
+
+def run(repo, item_code, threads, scans_per_thread, slots_per_thread):
+    """Runs the scan workload from `threads` threads and returns scans per second."""
+    errors = []
+
+    def worker(index):
+        first = index * slots_per_thread + 1
+        try:
+            for n in range(scans_per_thread):
+                scan(repo, item_code, first + n % slots_per_thread)
+        except Exception as e:
+            errors.append(e)
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - started
+
+    if errors:
+        raise errors[0]
+    return threads * scans_per_thread / elapsed
+
+
+def benchmark(label, repo, args, item_code):
+    truck_id = seed(repo, item_code, args.threads * args.slots)
+    try:
+        rate = run(repo, item_code, args.threads, args.scans, args.slots)
+    finally:
+        repo.delete_truck(truck_id)
+        repo.delete_allowed_items([item_code])
+    print(f"{label:<28}{rate:>10.1f} scans/s")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", choices=("sqlite", "supabase"), default="sqlite")
+    parser.add_argument("--threads", type=int, default=8, help="concurrent scanning sessions")
+    parser.add_argument("--scans", type=int, default=250, help="scans per session")
+    parser.add_argument("--slots", type=int, default=20, help="inventory units per session")
+    args = parser.parse_args()
+
+    print(f"{args.threads} sessions x {args.scans} scans, {args.backend} backend")
+    item_code = f"BENCHMARK-{os.getpid()}"
+
+    if args.backend == "supabase":
+        from dotenv import load_dotenv
+        from supabase import create_client
+
+        load_dotenv(".env")
+        client = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+        benchmark("supabase", SupabaseRepository(client), args, item_code)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Separate files: journal_mode=WAL is stored in the database file
+        before = benchmark("sqlite (default settings)", SQLiteRepository(os.path.join(tmp, "before.db"), tuned=False), args, item_code)
+        after = benchmark("sqlite (tuned)", SQLiteRepository(os.path.join(tmp, "after.db")), args, item_code)
+    print(f"speed-up: {after / before:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
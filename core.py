@@ -0,0 +1,352 @@
+# core.py
+"""Shared core of the multipage app: the repository, cached reads and helpers.
+
+Imported once per server process by app.py and every page in modes/, so the
+backend client, mirror and cached reads are set up once and each rerun only
+executes the current page.
+"""
+import datetime
+import os
+import threading
+import uuid
+
+import streamlit as st
+from dotenv import load_dotenv
+
+from dedupe import RecentRequests
+from mirror import SQLiteMirror
+from repository import MirroredRepository, SQLiteRepository, SupabaseRepository, is_connection_error
+from write_queue import WriteBehindQueue
+
+# Load environment variables
+load_dotenv(".env")
+
+# --- Storage backend ---
+# "supabase" (default) uses the hosted database; "sqlite" runs the store
+# fully offline on a local file.
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "supabase")
+SQLITE_DB_NAME = os.getenv("SQLITE_DB_NAME", "inventory.db")
+
+# --- Supabase connection ---
+SUPABASE_URL = os.getenv("SUPABASE_URL")
+SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+
+# --- Local read mirror (Supabase backend: Admin, Truck Management and Analytics reads) ---
+USE_LOCAL_MIRROR = os.getenv("USE_LOCAL_MIRROR", "1") == "1"
+MIRROR_DB_NAME = os.getenv("MIRROR_DB_NAME", "mirror.db")
+MIRROR_MAX_STALENESS = float(os.getenv("MIRROR_MAX_STALENESS", "30"))  # seconds
+MIRROR_REFRESH_INTERVAL = float(os.getenv("MIRROR_REFRESH_INTERVAL", "5"))  # seconds
+
+# --- Write-behind scan journal: User Mode status changes and Truck Mode receives (on by default for Supabase) ---
+USE_WRITE_BEHIND = os.getenv("USE_WRITE_BEHIND", "1" if STORAGE_BACKEND == "supabase" else "0") == "1"
+SCAN_QUEUE_DB_NAME = os.getenv("SCAN_QUEUE_DB_NAME", "scan_queue.db")
+SCAN_QUEUE_BATCH_SIZE = int(os.getenv("SCAN_QUEUE_BATCH_SIZE", "50"))
+
+# --- Scan idempotency: how long a station remembers a scan write's request id ---
+SCAN_DEDUPE_TTL = float(os.getenv("SCAN_DEDUPE_TTL", "30"))  # seconds
+
+def ensure_default_admin(repo):
+    # Check if any users exist
+    if not repo.list_users():
+        # Insert default admin
+        repo.add_user("Lauren", "952426", "admin")
+
+@st.cache_resource(show_spinner=False)
+def get_repository():
+    if STORAGE_BACKEND == "sqlite":
+        repo = SQLiteRepository(SQLITE_DB_NAME)
+    else:
+        # Imported here: an offline (SQLite) station never needs the client
+        from supabase import create_client
+
+        supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+        repo = SupabaseRepository(supabase)
+        if USE_LOCAL_MIRROR:
+            mirror = SQLiteMirror(supabase, MIRROR_DB_NAME, MIRROR_MAX_STALENESS, MIRROR_REFRESH_INTERVAL).start()
+            repo = MirroredRepository(repo, mirror)
+    return repo
+
+repo = get_repository()
+
+# Ensure default admin exists (once per process, not on every rerun). A
+# failed attempt is not cached, so a station that starts during an outage
+# still loads its pages and tries again at the next login.
+@st.cache_resource(show_spinner=False)
+def _default_admin_ensured():
+    ensure_default_admin(repo)
+    return True
+
+def bootstrap_default_admin():
+    try:
+        _default_admin_ensured()
+    except Exception as e:
+        if not is_connection_error(e):
+            raise
+
+bootstrap_default_admin()
+
+@st.cache_resource(show_spinner=False)
+def get_write_queue():
+    """The process-wide scan journal, or None when scans are written straight to the backend."""
+    if not USE_WRITE_BEHIND:
+        return None
+    return WriteBehindQueue(repo, SCAN_QUEUE_DB_NAME, batch_size=SCAN_QUEUE_BATCH_SIZE).start()
+
+write_queue = get_write_queue()
+
+@st.cache_resource(show_spinner=False)
+def get_recent_requests():
+    return RecentRequests(SCAN_DEDUPE_TTL)
+
+recent_requests = get_recent_requests()
+
+
+def init_session_state():
+    """Session defaults shared by the pages; app.py calls this on every run."""
+    if "truck_logged_in" not in st.session_state:
+        st.session_state.truck_logged_in = False
+        st.session_state.truck_username = ""
+        st.session_state.truck_role = ""
+    if "admin_logged_in" not in st.session_state:
+        st.session_state.admin_logged_in = False
+        st.session_state.admin_username = ""
+    if "last_processed_scan" not in st.session_state:
+        st.session_state.last_processed_scan = ""
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+
+
+# ----------------- Helper functions -----------------
+def scan_request_id(*parts):
+    """Idempotency key for a scan write, fixed by this browser session and `parts`.
+
+    A write with no natural key (a User Mode scan) passes a fresh uuid;
+    receiving an anticipated item passes its id, so receiving the same item
+    again from this session is recognised as the same request.
+    """
+    return ":".join([st.session_state.session_id, *map(str, parts)])
+
+
+def check_login(username, password_input):
+    """Returns (is_valid, role).
+
+    Users are never mirrored, so logins need the backend: while it cannot be
+    reached an offline message is shown and is_valid is None, not False.
+    """
+    bootstrap_default_admin()
+    try:
+        user_data = repo.get_user(username)
+        if user_data:
+            stored_password = user_data['password']
+            role = user_data['role']
+            if password_input == stored_password:
+                return True, role
+    except Exception as e:
+        if is_connection_error(e):
+            st.error("Offline: the database cannot be reached, so logins cannot be checked. "
+                     "Try again when the connection returns.")
+            return None, None
+        # Treat a backend error like a failed login
+        return False, None
+    return False, None
+
+
+def get_next_slot(item_code, assigned):
+    """Next free slot for `item_code`; `assigned` maps item codes to slots already handed out in this batch."""
+    if item_code not in assigned:
+        assigned[item_code] = set()
+
+    # Every unit still in inventory holds its slot, depleted ones included:
+    # (item_code, slot) is unique there until the unit is archived. Pruned
+    # trucks leave no anticipated rows, so inventory is what keeps slots taken
+    inventory_slots = {int(item['slot']) for item in repo.list_item_slots(item_code) if item.get('slot')}
+    anticipated_slots = repo.list_anticipated_slots(item_code)
+    used_slots = inventory_slots | {
+        int(slot) for slot in anticipated_slots if slot
+    } | assigned[item_code]
+
+    # Step 1: Find the highest used slot
+    highest_used = max(used_slots) if used_slots else 0
+
+    # Step 2: Assign next slot if it's within range
+    if highest_used < 99:
+        next_slot = highest_used + 1
+        assigned[item_code].add(next_slot)
+        return next_slot
+
+    # Step 3: Wrap to the lowest free slot if all 1-99 are used; archived
+    # units are no longer in inventory, so their slots are free again
+    available_slots = sorted(set(range(1, 100)) - used_slots)
+    if available_slots:
+        slot = available_slots[0]
+    else:
+        slot = 1  # fallback if nothing else is open
+
+    assigned[item_code].add(slot)
+    return slot
+
+
+# ----------------- Cached reads -----------------
+# Every table has a version counter in `data_versions`, bumped by triggers on
+# each write (see migrations/postgres/001_data_versions.sql). Reads below are
+# cached per version, so a rerun costs one tiny query unless something moved.
+
+# This module outlives a script run, so the per-run version memo is kept per
+# script thread and cleared by app.py at the start of every run
+_run = threading.local()
+
+def data_version(table):
+    versions = getattr(_run, "data_versions", None)
+    if versions is None:
+        # Fetch all version counters once per script run
+        versions = _run.data_versions = repo.data_versions()
+    return versions.get(table, 0)
+
+def mark_data_changed():
+    """Call after every write so cached reads re-check versions on next use."""
+    _run.data_versions = None
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _allowed_items(version):
+    return repo.list_allowed_items()
+
+def get_allowed_items():
+    return _allowed_items(data_version('allowed_items'))
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def _inventory(version):
+    return repo.list_inventory()
+
+def get_inventory():
+    return _inventory(data_version('inventory'))
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _users(version):
+    return repo.list_users()
+
+def get_users():
+    return _users(data_version('users'))
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _truck_item_counts(truck_id, versions):
+    return repo.count_truck_items(truck_id)
+
+def get_truck_item_counts(truck_id):
+    """Per item and status counts for one truck; refetched only after a scan, close or compaction."""
+    return _truck_item_counts(truck_id, (data_version('anticipated_items'), data_version('anticipated_item_counts')))
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _truck_names(truck_ids, version):
+    return repo.get_truck_names(truck_ids)
+
+def get_truck_names(truck_ids):
+    return _truck_names(tuple(sorted(truck_ids)), data_version('anticipated_trucks'))
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _reprint_labels(text, version):
+    return repo.search_in_stock_labels(text)
+
+def search_reprint_labels(text):
+    return _reprint_labels(text, data_version('inventory'))
+
+def show_mirror_freshness():
+    if isinstance(repo, MirroredRepository):
+        st.caption(repo.mirror.describe_freshness())
+
+# For scans that need the database while it cannot be reached and no snapshot can stand in
+OFFLINE_SCAN_MESSAGE = ("Offline: the database cannot be reached and this station has no copy of it yet, "
+                        "so the scan cannot be checked. Scan it again when the connection returns.")
+
+def show_sync_status():
+    """Offline banner for the scan pages, plus the scans this station still has to sync."""
+    stats = write_queue.stats() if write_queue else None
+    offline = (isinstance(repo, MirroredRepository) and repo.offline_since is not None) or (stats and stats["offline"])
+    if offline:
+        if write_queue:
+            st.warning("Offline: the database cannot be reached. Scans are checked against this station's last snapshot, "
+                       "saved here, and synced in order when the connection returns.")
+        else:
+            st.warning("Offline: the database cannot be reached, so scans cannot be saved.")
+    if not stats:
+        return
+    if stats["depth"]:
+        st.caption(f"{stats['depth']} scans waiting to sync.")
+    if stats["rejected"]:
+        st.warning(f"{stats['rejected']} synced scans conflicted with changes made on another station and were not applied. "
+                   "See Admin Mode > Scan Queue.")
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _notification(section, version):
+    return repo.get_notification(section)
+
+def show_notification(section):
+    """Shows the message admins posted to this section (user, truck or admin), if any."""
+    notification = _notification(section, data_version('notifications'))
+    if notification:
+        st.info(f"📢 {notification['message']}\n\n— *{notification['sender']}*")
+
+
+# ----------------- Truck picker -----------------
+TRUCK_PICKER_PAGE_SIZE = 20
+TRUCK_STATUS_FILTERS = {"Open": False, "Closed": True, "All": None}
+
+def truck_label(truck):
+    return f"ID {truck['id']} - {truck['truck_name']} ({truck['created_at'].split('T')[0]})"
+
+def truck_picker(key, label, default_status="Open"):
+    """Searchable, paginated truck selectbox shared by the modes; returns the chosen truck row or None.
+
+    Only one page of trucks matching the filters is fetched, newest first.
+    The page is kept in the session and refetched when the filters, the page
+    or the anticipated_trucks version change.
+    """
+    with st.expander("Search trucks"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            status = st.selectbox("Status", list(TRUCK_STATUS_FILTERS), index=list(TRUCK_STATUS_FILTERS).index(default_status), key=f"{key}_status")
+        with col2:
+            name_prefix = st.text_input("Name starts with", key=f"{key}_name").strip()
+        with col3:
+            dates = st.date_input("Created between", value=(), key=f"{key}_dates")
+
+    created_from = dates[0].isoformat() if len(dates) > 0 else None
+    created_before = (dates[-1] + datetime.timedelta(days=1)).isoformat() if len(dates) > 0 else None
+    filters = (status, name_prefix, created_from, created_before)
+
+    # New filters start again from the newest page
+    if st.session_state.get(f"{key}_filters") != filters:
+        st.session_state[f"{key}_filters"] = filters
+        st.session_state[f"{key}_page"] = 0
+    page = st.session_state[f"{key}_page"]
+
+    query = (filters, page, data_version('anticipated_trucks'))
+    cached = st.session_state.get(f"{key}_results")
+    if cached is None or cached[0] != query:
+        # One row past the page tells us whether an older page exists
+        rows = repo.search_trucks(
+            closed=TRUCK_STATUS_FILTERS[status],
+            created_from=created_from,
+            created_before=created_before,
+            name_prefix=name_prefix or None,
+            limit=TRUCK_PICKER_PAGE_SIZE + 1,
+            offset=page * TRUCK_PICKER_PAGE_SIZE,
+        )
+        cached = st.session_state[f"{key}_results"] = (query, rows)
+    rows = cached[1]
+    trucks = rows[:TRUCK_PICKER_PAGE_SIZE]
+
+    if page > 0 or len(rows) > TRUCK_PICKER_PAGE_SIZE:
+        col1, col2 = st.columns(2)
+        with col1:
+            st.button("Newer trucks", key=f"{key}_newer", disabled=page == 0,
+                      on_click=lambda: st.session_state.update({f"{key}_page": page - 1}))
+        with col2:
+            st.button("Older trucks", key=f"{key}_older", disabled=len(rows) <= TRUCK_PICKER_PAGE_SIZE,
+                      on_click=lambda: st.session_state.update({f"{key}_page": page + 1}))
+
+    if not trucks:
+        return None
+    by_id = {truck['id']: truck for truck in trucks}
+    t_id = st.selectbox(label, list(by_id), format_func=lambda i: truck_label(by_id[i]), key=f"{key}_choice")
+    return by_id[t_id]
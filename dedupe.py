@@ -0,0 +1,53 @@
+# dedupe.py
+import collections
+import threading
+import time
+
+
+class RecentRequests:
+    """Scan write outcomes by request id, remembered for `ttl` seconds.
+
+    Sits in front of the scan_requests record in the database: a scanner
+    double-fire or a rerun that submits the same write again is answered
+    from memory without a round trip. Older repeats still reach the
+    database, which answers them from scan_requests.
+    """
+
+    def __init__(self, ttl=30, max_entries=4096):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # request_id -> (expires_at, applied), oldest first
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, request_id):
+        """Whether the request applied, or None if it was not seen in the last `ttl` seconds."""
+        with self._lock:
+            entry = self._entries.get(request_id)
+            if entry is None or entry[0] < time.monotonic():
+                return None
+            return entry[1]
+
+    def put(self, request_id, applied):
+        now = time.monotonic()
+        with self._lock:
+            self._entries.pop(request_id, None)
+            self._entries[request_id] = (now + self.ttl, applied)
+            while self._entries and (len(self._entries) > self.max_entries or next(iter(self._entries.values()))[0] < now):
+                self._entries.popitem(last=False)
+
+    def deduplicate(self, request_ids, write):
+        """Runs `write` for the request ids not seen recently; returns the set of all ids that applied.
+
+        `write(request_ids)` makes the writes for those ids and returns the
+        ids that applied. Ids seen within `ttl` are answered from memory.
+        """
+        known = {request_id: self.get(request_id) for request_id in request_ids}
+        fresh = [request_id for request_id, applied in known.items() if applied is None]
+        applied = {request_id for request_id, done in known.items() if done}
+        if fresh:
+            done = set(write(fresh))
+            for request_id in fresh:
+                self.put(request_id, request_id in done)
+            applied |= done
+        return applied
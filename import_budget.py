@@ -0,0 +1,99 @@
+# import_budget.py
+"""Import-time budget for the User Mode scan station.
+
+Runs `python -X importtime` over the modules a scan station loads (the
+imports of app.py and modes/user_mode.py) in a fresh interpreter, prints the
+slowest ones and exits non-zero when the total is over budget or a module
+that only other pages need got pulled in.
+
+    python import_budget.py                   # default budget
+    python import_budget.py --budget 0.6      # seconds
+    python import_budget.py --top 20
+
+The measurement uses a throwaway SQLite store, so it runs offline and
+core.py's repository setup is included in its import time. Only that path
+is covered: the default Supabase backend imports its client while core.py
+builds the repository and needs the network to finish, so its stations are
+not measured here.
+"""
+import argparse
+import ast
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SCAN_STATION_FILES = ["app.py", os.path.join("modes", "user_mode.py")]
+
+# Seconds for the whole scan-station import graph
+IMPORT_BUDGET = 0.75
+
+# Loaded on demand by the pages that render barcodes, PDFs or DataFrames;
+# a scan station must not import them
+LAZY_MODULES = ("pandas", "numpy", "reportlab", "barcode", "PIL")
+
+
+def top_level_imports(path):
+    """Module names imported at module level by a file."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            modules.append(node.module)
+    return modules
+
+
+def measure(modules):
+    """Returns [(module, self_us, cumulative_us, depth)] from -X importtime, in import order."""
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, STORAGE_BACKEND="sqlite", SQLITE_DB_NAME=os.path.join(tmp, "budget.db"))
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "; ".join(f"import {m}" for m in modules)],
+            cwd=ROOT, env=env, capture_output=True, text=True,
+        )
+    if result.returncode != 0:
+        raise SystemExit(result.stderr)
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget", type=float, default=IMPORT_BUDGET, help="seconds allowed for all imports")
+    parser.add_argument("--top", type=int, default=10, help="slowest top-level imports to list")
+    args = parser.parse_args()
+
+    modules = list(dict.fromkeys(m for f in SCAN_STATION_FILES for m in top_level_imports(os.path.join(ROOT, f))))
+    rows = measure(modules)
+    total = sum(self_us for _, self_us, _, _ in rows) / 1e6
+
+    # Depth 0 is each module the station imports directly, inclusive of its own imports
+    print(f"Scan-station imports: {', '.join(modules)}")
+    for name, _, cumulative_us, _ in sorted((r for r in rows if r[3] == 0), key=lambda r: -r[2])[:args.top]:
+        print(f"  {cumulative_us / 1e3:>8.1f} ms  {name}")
+    print(f"Total: {total * 1e3:.1f} ms (budget {args.budget * 1e3:.0f} ms)")
+
+    loaded = sorted({name.split(".")[0] for name, _, _, _ in rows} & set(LAZY_MODULES))
+    failures = []
+    if loaded:
+        failures.append(f"imported modules that should load lazily: {', '.join(loaded)}")
+    if total > args.budget:
+        failures.append(f"over budget by {(total - args.budget) * 1e3:.1f} ms")
+    if failures:
+        raise SystemExit("FAIL: " + "; ".join(failures))
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
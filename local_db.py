@@ -0,0 +1,138 @@
+# local_db.py
+import contextlib
+import queue
+import sqlite3
+import threading
+
+from migrate import migrate_sqlite
+
+# --- Database setup ---
+DB_NAME = "inventory.db"
+
+# Applied to every connection. WAL lets readers run alongside the single
+# writer instead of blocking on it; with WAL, synchronous=NORMAL only syncs at
+# checkpoints and stays safe against application crashes.
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 64 * 1024 * 1024,
+    "cache_size": -16000,  # negative means KiB, so ~16 MB of page cache
+    "busy_timeout": 5000,
+}
+
+# Prepared statements kept per connection; every query here is parameterised,
+# so a reused connection skips re-parsing them
+STATEMENT_CACHE_SIZE = 256
+
+# Connections a pool opens at most, and seconds a caller waits for one when
+# all are checked out
+POOL_SIZE = 8
+POOL_TIMEOUT = 10
+
+
+def get_connection(db_name=DB_NAME, tuned=True, check_same_thread=True, pragmas=None):
+    """Establishes and returns a database connection with rows accessible by column name.
+
+    `tuned=False` leaves SQLite's defaults (rollback journal, full sync) in
+    place; it is only kept for benchmarking against the tuned settings.
+    `pragmas` override entries of PRAGMAS for this connection.
+    """
+    conn = sqlite3.connect(db_name, cached_statements=STATEMENT_CACHE_SIZE, check_same_thread=check_same_thread)
+    conn.row_factory = sqlite3.Row
+    if tuned:
+        for name, value in {**PRAGMAS, **(pragmas or {})}.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+    return conn
+
+
+class ConnectionPool:
+    """A bounded set of long-lived connections to one database file, checked out per operation.
+
+    Streamlit runs every rerun of a script in a new thread, so a connection
+    kept per thread would be reopened on each rerun. Pooled connections are
+    opened with check_same_thread=False and used by one thread at a time:
+    `connection()` checks one out for the length of a `with` block and puts
+    it back afterwards, rolling back any transaction left open. Up to `size`
+    connections are opened, as they are needed; when all are checked out a
+    caller waits up to `timeout` seconds for one to come back. A thread that
+    already holds a connection gets that one again, so nested calls share
+    its transaction instead of waiting on it.
+    """
+
+    def __init__(self, db_name=DB_NAME, size=POOL_SIZE, timeout=POOL_TIMEOUT, pragmas=None):
+        self.db_name = db_name
+        self.size = size
+        self.timeout = timeout
+        self.pragmas = pragmas
+        # Most recently used first, so a quiet app keeps reusing a warm connection
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+        self._held = threading.local()
+
+    @contextlib.contextmanager
+    def connection(self):
+        conn = getattr(self._held, "conn", None)
+        if conn is not None:
+            yield conn
+            return
+        conn = self._held.conn = self._checkout()
+        try:
+            yield conn
+        finally:
+            self._held.conn = None
+            self._checkin(conn)
+
+    def _checkout(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            can_open = self._opened < self.size
+            if can_open:
+                self._opened += 1
+        if can_open:
+            try:
+                return get_connection(self.db_name, check_same_thread=False, pragmas=self.pragmas)
+            except Exception:
+                with self._lock:
+                    self._opened -= 1
+                raise
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError(
+                f"All {self.size} connections to {self.db_name} are in use; none came back within {self.timeout}s"
+            ) from None
+
+    def _checkin(self, conn):
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            # A connection that cannot roll back is not handed out again
+            conn.close()
+            with self._lock:
+                self._opened -= 1
+            return
+        self._idle.put(conn)
+
+
+def table_columns(conn, table):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def primary_key(conn, table):
+    """Primary key columns of a table, in key order."""
+    keyed = [(row[5], row[1]) for row in conn.execute(f"PRAGMA table_info({table})") if row[5]]
+    return [name for _, name in sorted(keyed)]
+
+
+def setup_database(db_name=DB_NAME, tuned=True):
+    """Brings the database file up to the latest schema by applying any pending migrations (see migrate.py)."""
+    conn = get_connection(db_name, tuned=tuned)
+    try:
+        migrate_sqlite(conn)
+    finally:
+        conn.close()
@@ -0,0 +1,84 @@
+# maintenance.py
+"""Housekeeping jobs that keep the hot tables small.
+
+    python maintenance.py archive [--days N] [--batch-size N]
+    python maintenance.py compact [--prune]
+    python maintenance.py prune-requests [--days N]
+
+Run it from cron (or by hand) against the same backend the app uses:
+STORAGE_BACKEND, SQLITE_DB_NAME, SUPABASE_URL and SUPABASE_KEY are read
+from .env.
+"""
+import argparse
+import datetime
+import os
+
+from dotenv import load_dotenv
+
+from repository import SQLiteRepository, SupabaseRepository
+
+load_dotenv(".env")
+
+# Depleted units older than this move to inventory_history
+ARCHIVE_AFTER_DAYS = 90
+ARCHIVE_BATCH_SIZE = 500
+
+# Scan request ids are kept this long; longer than any station stays offline
+SCAN_REQUEST_RETENTION_DAYS = 30
+
+
+def archive_depleted_inventory(repo, older_than_days=ARCHIVE_AFTER_DAYS, batch_size=ARCHIVE_BATCH_SIZE):
+    """Moves every unit depleted more than `older_than_days` ago into inventory_history.
+
+    Works in batches of `batch_size` rows, each its own transaction, so scans
+    are never blocked behind one long delete. Returns the number of rows moved.
+    """
+    cutoff = (datetime.datetime.now() - datetime.timedelta(days=older_than_days)).isoformat()
+    total = 0
+    while True:
+        moved = repo.archive_depleted(cutoff, batch_size)
+        total += moved
+        if moved < batch_size:
+            return total
+
+
+def repository_from_env():
+    if os.getenv("STORAGE_BACKEND", "supabase") == "sqlite":
+        return SQLiteRepository(os.getenv("SQLITE_DB_NAME", "inventory.db"))
+
+    from supabase import create_client
+
+    return SupabaseRepository(create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY")))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Housekeeping jobs that keep the hot tables small.")
+    jobs = parser.add_subparsers(dest="job", required=True)
+
+    archive = jobs.add_parser("archive", help="move old depleted inventory into inventory_history")
+    archive.add_argument("--days", type=int, default=int(os.getenv("ARCHIVE_AFTER_DAYS", ARCHIVE_AFTER_DAYS)))
+    archive.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+
+    compact = jobs.add_parser("compact", help="summarise closed trucks into per-item counts")
+    compact.add_argument("--prune", action="store_true", help="also delete the per-unit rows of compacted trucks")
+
+    prune_requests = jobs.add_parser("prune-requests", help="forget old scan request ids (idempotency keys)")
+    prune_requests.add_argument("--days", type=int, default=SCAN_REQUEST_RETENTION_DAYS)
+
+    args = parser.parse_args()
+    repo = repository_from_env()
+
+    if args.job == "archive":
+        moved = archive_depleted_inventory(repo, args.days, args.batch_size)
+        print(f"Archived {moved} depleted units older than {args.days} days.")
+    elif args.job == "compact":
+        compacted = repo.compact_closed_trucks(args.prune)
+        print(f"Compacted {compacted} closed trucks." + (" Pruned their unit rows." if args.prune else ""))
+    elif args.job == "prune-requests":
+        cutoff = (datetime.datetime.now() - datetime.timedelta(days=args.days)).isoformat()
+        pruned = repo.prune_scan_requests(cutoff)
+        print(f"Pruned {pruned} scan request ids older than {args.days} days.")
+
+
+if __name__ == "__main__":
+    main()
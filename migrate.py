@@ -0,0 +1,278 @@
+# migrate.py
+"""Versioned schema migrations for the Postgres (Supabase) and SQLite backends.
+
+Migrations are the numbered .sql files in migrations/postgres and
+migrations/sqlite. Each database records the versions it has applied in
+`schema_migrations`; pending files run in order, each in its own
+transaction.
+
+    python migrate.py sqlite [DB_FILE]         # default: SQLITE_DB_NAME or inventory.db
+    python migrate.py postgres                 # needs DATABASE_URL and psycopg2
+    python migrate.py sqlite --explain         # also print query plans for the hot queries
+
+SQLite files are migrated automatically by local_db.setup_database; the
+Postgres side has to be run by hand since the app only holds an API key.
+"""
+import argparse
+import datetime
+import os
+import re
+import sqlite3
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+# Every index the hot queries rely on; `verify_indexes` fails if one is missing
+EXPECTED_INDEXES = {
+    "inventory_item_status_added_at_idx": "inventory",
+    "inventory_depleted_at_idx": "inventory",
+    "anticipated_items_truck_status_idx": "anticipated_items",
+    "anticipated_items_barcode_label_idx": "anticipated_items",
+    "anticipated_trucks_created_at_idx": "anticipated_trucks",
+    "anticipated_trucks_status_created_at_idx": "anticipated_trucks",
+    "inventory_in_stock_item_code_idx": "inventory",
+}
+
+# Queries run on every scan or truck screen (see repository.py), with sample
+# parameters for EXPLAIN. A query the backends write differently gives its
+# SQL per backend.
+HOT_QUERIES = [
+    (
+        "FIFO oldest in-stock unit",
+        "SELECT slot FROM inventory WHERE item_code = ? AND status = 'in_stock' ORDER BY added_at LIMIT 1",
+        ("CFA SAUCE",),
+    ),
+    (
+        "Reprint label search",
+        {
+            # LIKE ignores case in SQLite; the Supabase client sends ilike
+            "sqlite": "SELECT item_code, slot FROM inventory WHERE status = 'in_stock' AND item_code LIKE ? ORDER BY item_code, slot LIMIT 20",
+            "postgres": "SELECT item_code, slot FROM inventory WHERE status = 'in_stock' AND item_code ILIKE ? ORDER BY item_code, slot LIMIT 20",
+        },
+        ("cfa%",),
+    ),
+    (
+        "Depletions since",
+        "SELECT item_code, in_use_at, depleted_at FROM inventory WHERE depleted_at >= ?",
+        ("2025-01-01",),
+    ),
+    (
+        "Newest depletion",
+        "SELECT MAX(depleted_at) FROM inventory",
+        (),
+    ),
+    (
+        "Truck items",
+        "SELECT * FROM anticipated_items WHERE truck_id = ?",
+        (1,),
+    ),
+    (
+        "Truck item counts",
+        "SELECT item_code, status, item_count FROM truck_item_status_counts WHERE truck_id = ?",
+        (1,),
+    ),
+    (
+        "Newest open trucks",
+        "SELECT * FROM anticipated_trucks WHERE status != 'closed' ORDER BY created_at DESC LIMIT 21",
+        (),
+    ),
+    (
+        "Mark pending items missing",
+        "UPDATE anticipated_items SET status = 'missing' WHERE truck_id = ? AND status = 'pending'",
+        (1,),
+    ),
+    (
+        "Truck pending labels",
+        "SELECT id, item_code, slot, barcode_label FROM anticipated_items WHERE truck_id = ? AND status = 'pending'",
+        (1,),
+    ),
+    (
+        "Scan request ids seen",
+        "SELECT request_id, applied FROM scan_requests WHERE request_id IN (?)",
+        ("0:receive:1",),
+    ),
+]
+
+MIGRATIONS_TABLE = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        applied_at TEXT NOT NULL
+    )
+"""
+
+ADD_COLUMN = re.compile(r"ALTER\s+TABLE\s+(\w+)\s+ADD\s+COLUMN\s+(\w+)", re.IGNORECASE)
+
+
+def list_migrations(backend):
+    """Returns [(version, name, path)] for a backend's migration files, in order."""
+    directory = os.path.join(MIGRATIONS_DIR, backend)
+    migrations = []
+    for filename in sorted(os.listdir(directory)):
+        match = re.match(r"(\d+)_(.+)\.sql$", filename)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2), os.path.join(directory, filename)))
+    return migrations
+
+
+def read_sql(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+# --- SQLite ---
+
+def split_sqlite_statements(script):
+    """Splits a script into complete statements (trigger bodies stay whole)."""
+    statements, current = [], ""
+    for line in script.splitlines(keepends=True):
+        current += line
+        if sqlite3.complete_statement(current):
+            statement = re.sub(r"^\s*--.*$", "", current, flags=re.MULTILINE).strip()
+            if statement:
+                statements.append(statement)
+            current = ""
+    return statements
+
+
+def migrate_sqlite(conn):
+    """Applies pending SQLite migrations on `conn`; returns the names applied."""
+    conn.execute(MIGRATIONS_TABLE)
+    conn.commit()
+    applied = {row[0] for row in conn.execute("SELECT version FROM schema_migrations")}
+
+    done = []
+    for version, name, path in list_migrations("sqlite"):
+        if version in applied:
+            continue
+        # Explicit transaction: sqlite3 would otherwise commit before each DDL statement
+        isolation_level = conn.isolation_level
+        conn.isolation_level = None
+        try:
+            conn.execute("BEGIN")
+            for statement in split_sqlite_statements(read_sql(path)):
+                # Files created before migrations were tracked may already have the column
+                match = ADD_COLUMN.match(statement)
+                if match and match.group(2) in [row[1] for row in conn.execute(f"PRAGMA table_info({match.group(1)})")]:
+                    continue
+                conn.execute(statement)
+            conn.execute(
+                "INSERT INTO schema_migrations (version, name, applied_at) VALUES (?, ?, ?)",
+                (version, name, datetime.datetime.now().isoformat()),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.isolation_level = isolation_level
+        done.append(f"{version:03d}_{name}")
+    return done
+
+
+def sqlite_indexes(conn):
+    return {row[0]: row[1] for row in conn.execute("SELECT name, tbl_name FROM sqlite_master WHERE type = 'index'")}
+
+
+def explain_sqlite(conn, sql, params):
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+
+# --- Postgres ---
+
+def connect_postgres(database_url):
+    try:
+        import psycopg2
+    except ImportError:
+        raise SystemExit("Postgres migrations need psycopg2: pip install psycopg2-binary")
+    return psycopg2.connect(database_url)
+
+
+def migrate_postgres(conn):
+    """Applies pending Postgres migrations on a psycopg2 connection; returns the names applied."""
+    with conn, conn.cursor() as cur:
+        cur.execute(MIGRATIONS_TABLE)
+        cur.execute("SELECT version FROM schema_migrations")
+        applied = {row[0] for row in cur.fetchall()}
+
+    done = []
+    for version, name, path in list_migrations("postgres"):
+        if version in applied:
+            continue
+        # `with conn` commits the file and its bookkeeping row together, or neither
+        with conn, conn.cursor() as cur:
+            cur.execute(read_sql(path))
+            cur.execute(
+                "INSERT INTO schema_migrations (version, name, applied_at) VALUES (%s, %s, %s)",
+                (version, name, datetime.datetime.now().isoformat()),
+            )
+        done.append(f"{version:03d}_{name}")
+    return done
+
+
+def postgres_indexes(conn):
+    with conn, conn.cursor() as cur:
+        cur.execute("SELECT indexname, tablename FROM pg_indexes WHERE schemaname = current_schema()")
+        return dict(cur.fetchall())
+
+
+def explain_postgres(conn, sql, params):
+    # EXPLAIN without ANALYZE, so the UPDATE is planned but not run
+    with conn, conn.cursor() as cur:
+        cur.execute(f"EXPLAIN {sql.replace('?', '%s')}", params)
+        return [row[0] for row in cur.fetchall()]
+
+
+# --- Verification ---
+
+def verify_indexes(indexes):
+    """Raises if any expected index is missing or on the wrong table."""
+    missing = [name for name, table in EXPECTED_INDEXES.items() if indexes.get(name) != table]
+    if missing:
+        raise RuntimeError(f"Missing indexes: {', '.join(missing)}")
+
+
+def print_query_plans(explain, backend):
+    for title, sql, params in HOT_QUERIES:
+        if isinstance(sql, dict):
+            sql = sql[backend]
+        print(f"\n{title}:\n  {sql}")
+        for line in explain(sql, params):
+            print(f"    {line}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply schema migrations and verify the hot-query indexes.")
+    parser.add_argument("backend", choices=("sqlite", "postgres"))
+    parser.add_argument("database", nargs="?", help="SQLite file (default: SQLITE_DB_NAME or inventory.db)")
+    parser.add_argument("--explain", action="store_true", help="print the query plan of each hot query")
+    args = parser.parse_args()
+
+    if args.backend == "sqlite":
+        from local_db import get_connection
+
+        conn = get_connection(args.database or os.getenv("SQLITE_DB_NAME", "inventory.db"))
+        applied = migrate_sqlite(conn)
+        indexes = sqlite_indexes(conn)
+        explain = lambda sql, params: explain_sqlite(conn, sql, params)
+    else:
+        from dotenv import load_dotenv
+
+        load_dotenv(".env")
+        database_url = os.getenv("DATABASE_URL")
+        if not database_url:
+            raise SystemExit("Set DATABASE_URL to the Postgres connection string (Supabase: Settings > Database).")
+        conn = connect_postgres(database_url)
+        applied = migrate_postgres(conn)
+        indexes = postgres_indexes(conn)
+        explain = lambda sql, params: explain_postgres(conn, sql, params)
+
+    print("Applied: " + (", ".join(applied) if applied else "nothing, already up to date"))
+    verify_indexes(indexes)
+    print("Indexes verified: " + ", ".join(EXPECTED_INDEXES))
+    if args.explain:
+        print_query_plans(explain, args.backend)
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+-- Per-table version counters for cheap cache validation.
+-- Applied by `python migrate.py postgres`. Every insert/update/delete on a
+-- tracked table bumps its row here, so clients can revalidate cached
+-- reads with a single query on this small table.
+
+CREATE TABLE IF NOT EXISTS data_versions (
+    table_name TEXT PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+INSERT INTO data_versions (table_name) VALUES
+    ('allowed_items'),
+    ('users'),
+    ('inventory'),
+    ('anticipated_trucks'),
+    ('anticipated_items'),
+    ('analytics_history')
+ON CONFLICT (table_name) DO NOTHING;
+
+-- SECURITY DEFINER so the bump works regardless of the caller's row policies
+CREATE OR REPLACE FUNCTION bump_data_version() RETURNS trigger
+LANGUAGE plpgsql SECURITY DEFINER AS $$
+BEGIN
+    UPDATE data_versions
+    SET version = version + 1, updated_at = now()
+    WHERE table_name = TG_TABLE_NAME;
+    RETURN NULL;
+END;
+$$;
+
+-- One statement-level trigger per table: a bulk insert of 30 anticipated
+-- items bumps the counter once, not 30 times.
+DO $$
+DECLARE
+    t TEXT;
+BEGIN
+    FOREACH t IN ARRAY ARRAY['allowed_items', 'users', 'inventory', 'anticipated_trucks', 'anticipated_items', 'analytics_history'] LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', t || '_data_version', t);
+        EXECUTE format(
+            'CREATE TRIGGER %I AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON %I '
+            'FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version()',
+            t || '_data_version', t
+        );
+    END LOOP;
+END;
+$$;
+
+GRANT SELECT ON data_versions TO anon, authenticated;
@@ -0,0 +1,73 @@
+-- Change tracking for delta sync of inventory and anticipated_items.
+-- Applied by `python migrate.py postgres` after 001_data_versions.sql.
+-- `updated_at` is maintained by trigger on every insert/update, and deletes
+-- leave a tombstone in `deleted_rows` so mirrors can drop the row.
+
+ALTER TABLE inventory ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now();
+ALTER TABLE anticipated_items ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now();
+
+CREATE INDEX IF NOT EXISTS inventory_updated_at_idx ON inventory (updated_at);
+CREATE INDEX IF NOT EXISTS anticipated_items_updated_at_idx ON anticipated_items (updated_at);
+
+CREATE TABLE IF NOT EXISTS deleted_rows (
+    table_name TEXT NOT NULL,
+    row_id BIGINT NOT NULL,
+    deleted_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS deleted_rows_table_deleted_at_idx ON deleted_rows (table_name, deleted_at);
+
+CREATE OR REPLACE FUNCTION touch_updated_at() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.updated_at = now();
+    RETURN NEW;
+END;
+$$;
+
+-- Tombstones are kept for 30 days (sync.TOMBSTONE_RETENTION); older
+-- watermarks fall back to a full resync.
+CREATE OR REPLACE FUNCTION record_deleted_row() RETURNS trigger
+LANGUAGE plpgsql SECURITY DEFINER AS $$
+BEGIN
+    INSERT INTO deleted_rows (table_name, row_id) VALUES (TG_TABLE_NAME, OLD.id);
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION prune_deleted_rows() RETURNS trigger
+LANGUAGE plpgsql SECURITY DEFINER AS $$
+BEGIN
+    DELETE FROM deleted_rows WHERE deleted_at < now() - INTERVAL '30 days';
+    RETURN NULL;
+END;
+$$;
+
+DO $$
+DECLARE
+    t TEXT;
+BEGIN
+    FOREACH t IN ARRAY ARRAY['inventory', 'anticipated_items'] LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', t || '_touch_updated_at', t);
+        EXECUTE format(
+            'CREATE TRIGGER %I BEFORE INSERT OR UPDATE ON %I '
+            'FOR EACH ROW EXECUTE FUNCTION touch_updated_at()',
+            t || '_touch_updated_at', t
+        );
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', t || '_tombstone', t);
+        EXECUTE format(
+            'CREATE TRIGGER %I AFTER DELETE ON %I '
+            'FOR EACH ROW EXECUTE FUNCTION record_deleted_row()',
+            t || '_tombstone', t
+        );
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', t || '_prune_tombstones', t);
+        EXECUTE format(
+            'CREATE TRIGGER %I AFTER DELETE ON %I '
+            'FOR EACH STATEMENT EXECUTE FUNCTION prune_deleted_rows()',
+            t || '_prune_tombstones', t
+        );
+    END LOOP;
+END;
+$$;
+
+GRANT SELECT ON deleted_rows TO anon, authenticated;
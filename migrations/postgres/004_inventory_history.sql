@@ -0,0 +1,49 @@
+-- Archive for depleted inventory (see maintenance.py).
+-- Applied by `python migrate.py postgres`. Rows keep their inventory id and
+-- lifecycle timestamps so analytics can still read them, while `inventory`
+-- only holds live stock.
+
+CREATE TABLE IF NOT EXISTS inventory_history (
+    LIKE inventory INCLUDING DEFAULTS,
+    archived_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (id)
+);
+
+CREATE INDEX IF NOT EXISTS inventory_history_depleted_at_idx ON inventory_history (depleted_at);
+
+-- Moves one batch of units depleted before `cutoff` and returns how many
+-- moved. `cutoff` is an ISO string compared with the TEXT depleted_at as
+-- is, so inventory_depleted_at_idx serves it. Delete and insert happen in
+-- one statement, so a unit is never in both tables or in neither; SKIP
+-- LOCKED lets two runs overlap safely.
+CREATE OR REPLACE FUNCTION archive_depleted_inventory(cutoff TEXT, batch_size INTEGER DEFAULT 500)
+RETURNS INTEGER
+LANGUAGE sql AS $$
+    WITH moved AS (
+        DELETE FROM inventory
+        WHERE id IN (
+            SELECT id FROM inventory
+            WHERE status = 'depleted' AND depleted_at < cutoff
+            ORDER BY id
+            LIMIT batch_size
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING id, item_code, slot, status, added_by, added_at, in_stock_at, in_use_at, depleted_at, truck_id
+    ), archived AS (
+        INSERT INTO inventory_history (id, item_code, slot, status, added_by, added_at, in_stock_at, in_use_at, depleted_at, truck_id)
+        SELECT id, item_code, slot, status, added_by, added_at, in_stock_at, in_use_at, depleted_at, truck_id FROM moved
+        RETURNING 1
+    )
+    SELECT count(*)::INTEGER FROM archived;
+$$;
+
+INSERT INTO data_versions (table_name) VALUES ('inventory_history')
+ON CONFLICT (table_name) DO NOTHING;
+
+DROP TRIGGER IF EXISTS inventory_history_data_version ON inventory_history;
+CREATE TRIGGER inventory_history_data_version
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON inventory_history
+FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version();
+
+GRANT SELECT ON inventory_history TO anon, authenticated;
+GRANT EXECUTE ON FUNCTION archive_depleted_inventory(TEXT, INTEGER) TO anon, authenticated;
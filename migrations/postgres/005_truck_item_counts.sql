@@ -0,0 +1,56 @@
+-- Per-truck, per-item status counts for closed trucks (see maintenance.py
+-- compact). Applied by `python migrate.py postgres`. Once a truck is
+-- compacted its dashboard reads these rows, and its per-unit
+-- anticipated_items rows may be pruned.
+
+ALTER TABLE anticipated_trucks ADD COLUMN IF NOT EXISTS compacted_at TIMESTAMPTZ;
+
+CREATE TABLE IF NOT EXISTS anticipated_item_counts (
+    truck_id BIGINT NOT NULL REFERENCES anticipated_trucks (id) ON DELETE CASCADE,
+    item_code TEXT NOT NULL,
+    status TEXT NOT NULL,
+    item_count INTEGER NOT NULL,
+    PRIMARY KEY (truck_id, item_code, status)
+);
+
+-- Summarises every closed truck not compacted yet and returns how many it
+-- did. With `prune`, also deletes the per-unit rows of every compacted truck.
+CREATE OR REPLACE FUNCTION compact_closed_trucks(prune BOOLEAN DEFAULT FALSE)
+RETURNS INTEGER
+LANGUAGE plpgsql AS $$
+DECLARE
+    compacted INTEGER;
+BEGIN
+    WITH trucks AS (
+        UPDATE anticipated_trucks SET compacted_at = now()
+        WHERE status = 'closed' AND compacted_at IS NULL
+        RETURNING id
+    ), counts AS (
+        INSERT INTO anticipated_item_counts (truck_id, item_code, status, item_count)
+        SELECT i.truck_id, i.item_code, i.status, count(*)
+        FROM anticipated_items i JOIN trucks t ON t.id = i.truck_id
+        GROUP BY i.truck_id, i.item_code, i.status
+        ON CONFLICT (truck_id, item_code, status) DO UPDATE SET item_count = EXCLUDED.item_count
+    )
+    SELECT count(*) INTO compacted FROM trucks;
+
+    IF prune THEN
+        DELETE FROM anticipated_items i
+        USING anticipated_trucks t
+        WHERE t.id = i.truck_id AND t.compacted_at IS NOT NULL;
+    END IF;
+
+    RETURN compacted;
+END;
+$$;
+
+INSERT INTO data_versions (table_name) VALUES ('anticipated_item_counts')
+ON CONFLICT (table_name) DO NOTHING;
+
+DROP TRIGGER IF EXISTS anticipated_item_counts_data_version ON anticipated_item_counts;
+CREATE TRIGGER anticipated_item_counts_data_version
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON anticipated_item_counts
+FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version();
+
+GRANT SELECT ON anticipated_item_counts TO anon, authenticated;
+GRANT EXECUTE ON FUNCTION compact_closed_trucks(BOOLEAN) TO anon, authenticated;
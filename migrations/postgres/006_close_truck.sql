@@ -0,0 +1,47 @@
+-- Closes a truck in one transaction: pending items become missing, the
+-- truck is marked closed and its analytics_history row is written with
+-- counts taken in the database. Applied by `python migrate.py postgres`.
+-- `p_closed_at` is the app's ISO string, stored as is like every other
+-- timestamp column. Returns the summary as JSON; raises if the truck is
+-- missing or already closed, so a double click cannot record two closures.
+
+CREATE OR REPLACE FUNCTION close_truck(p_truck_id BIGINT, p_closed_by TEXT, p_closed_at TEXT)
+RETURNS JSON
+LANGUAGE plpgsql AS $$
+DECLARE
+    processed INTEGER;
+    missing INTEGER;
+    total INTEGER;
+BEGIN
+    UPDATE anticipated_trucks SET status = 'closed'
+    WHERE id = p_truck_id AND status IS DISTINCT FROM 'closed';
+    IF NOT FOUND THEN
+        IF EXISTS (SELECT 1 FROM anticipated_trucks WHERE id = p_truck_id) THEN
+            RAISE EXCEPTION 'Truck % is already closed', p_truck_id;
+        END IF;
+        RAISE EXCEPTION 'Truck % does not exist', p_truck_id;
+    END IF;
+
+    UPDATE anticipated_items SET status = 'missing'
+    WHERE truck_id = p_truck_id AND status = 'pending';
+
+    SELECT count(*) FILTER (WHERE status = 'scanned'),
+           count(*) FILTER (WHERE status = 'missing'),
+           count(*)
+    INTO processed, missing, total
+    FROM anticipated_items
+    WHERE truck_id = p_truck_id;
+
+    INSERT INTO analytics_history (truck_id, closed_by, closed_at, items_processed, items_missing, total_items)
+    VALUES (p_truck_id, p_closed_by, p_closed_at, processed, missing, total);
+
+    RETURN json_build_object(
+        'items_processed', processed,
+        'items_missing', missing,
+        'total_items', total,
+        'closed_at', p_closed_at
+    );
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION close_truck(BIGINT, TEXT, TEXT) TO anon, authenticated;
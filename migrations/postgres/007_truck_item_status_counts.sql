@@ -0,0 +1,18 @@
+-- Item counts per truck, item and status for the Truck Summary Dashboard.
+-- Applied by `python migrate.py postgres`. Open trucks are counted from
+-- anticipated_items (the truck_id/status index keeps this to one truck's
+-- rows); compacted trucks read their stored counts, since their unit rows
+-- may be pruned.
+
+CREATE OR REPLACE VIEW truck_item_status_counts
+WITH (security_invoker = true) AS
+SELECT i.truck_id, i.item_code, i.status, count(*)::INTEGER AS item_count
+FROM anticipated_items i
+JOIN anticipated_trucks t ON t.id = i.truck_id
+WHERE t.compacted_at IS NULL
+GROUP BY i.truck_id, i.item_code, i.status
+UNION ALL
+SELECT truck_id, item_code, status, item_count
+FROM anticipated_item_counts;
+
+GRANT SELECT ON truck_item_status_counts TO anon, authenticated;
@@ -0,0 +1,5 @@
+-- Indexes for the truck picker: newest trucks first, optionally only open
+-- or only closed ones. Applied by `python migrate.py postgres`.
+
+CREATE INDEX IF NOT EXISTS anticipated_trucks_created_at_idx ON anticipated_trucks (created_at);
+CREATE INDEX IF NOT EXISTS anticipated_trucks_status_created_at_idx ON anticipated_trucks (status, created_at);
@@ -0,0 +1,9 @@
+-- Index for the Truck Mode reprint search, which matches the start of an
+-- in-stock item's code ignoring case (ilike 'cfa%'). A plain btree cannot
+-- serve ilike; a trigram index can. Applied by `python migrate.py postgres`.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS inventory_in_stock_item_code_idx
+ON inventory USING gin (item_code gin_trgm_ops)
+WHERE status = 'in_stock';
@@ -0,0 +1,23 @@
+-- Messages admins post to the top of User, Truck and Admin Mode (see the
+-- Notifications page). Applied by `python migrate.py postgres`; databases
+-- that already have the table keep it as is.
+
+CREATE TABLE IF NOT EXISTS notifications (
+    id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    section TEXT NOT NULL,
+    message TEXT NOT NULL,
+    sender TEXT NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS notifications_section_created_at_idx ON notifications (section, created_at);
+
+INSERT INTO data_versions (table_name) VALUES ('notifications')
+ON CONFLICT (table_name) DO NOTHING;
+
+DROP TRIGGER IF EXISTS notifications_data_version ON notifications;
+CREATE TRIGGER notifications_data_version
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON notifications
+FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version();
+
+GRANT SELECT, INSERT, DELETE ON notifications TO anon, authenticated;
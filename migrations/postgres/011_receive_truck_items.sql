@@ -0,0 +1,28 @@
+-- Receives a batch of a truck's anticipated items in one transaction (Truck
+-- Mode batch receive). Applied by `python migrate.py postgres`. One bulk
+-- update marks the items still pending as scanned and one bulk insert adds
+-- them to inventory, stamped with the app's ISO string `p_received_at`;
+-- returns the ids received, so items scanned elsewhere in the meantime are
+-- skipped rather than received twice.
+
+CREATE OR REPLACE FUNCTION receive_truck_items(
+    p_truck_id BIGINT,
+    p_item_ids BIGINT[],
+    p_received_by TEXT,
+    p_received_at TEXT
+)
+RETURNS BIGINT[]
+LANGUAGE sql AS $$
+    WITH received AS (
+        UPDATE anticipated_items SET status = 'scanned', scanned_at = p_received_at
+        WHERE truck_id = p_truck_id AND status = 'pending' AND id = ANY (p_item_ids)
+        RETURNING id, item_code, slot
+    ), added AS (
+        INSERT INTO inventory (item_code, slot, status, added_by, added_at, in_stock_at, truck_id)
+        SELECT item_code, slot, 'in_stock', p_received_by, p_received_at, p_received_at, p_truck_id
+        FROM received
+    )
+    SELECT coalesce(array_agg(id), '{}') FROM received;
+$$;
+
+GRANT EXECUTE ON FUNCTION receive_truck_items(BIGINT, BIGINT[], TEXT, TEXT) TO anon, authenticated;
@@ -0,0 +1,29 @@
+-- Moves many inventory units to a new status in one statement (User Mode
+-- bulk update). Applied by `python migrate.py postgres`. Only units still
+-- in `p_expected` change; each gets its own timestamp from `p_units`
+-- ([{item_code, slot, changed_at}]) in the column of the new status, kept
+-- as the ISO string the station sent.
+-- Returns the (item_code, slot) of every unit updated.
+
+CREATE OR REPLACE FUNCTION update_inventory_statuses(p_units JSON, p_status TEXT, p_expected TEXT)
+RETURNS TABLE (item_code TEXT, slot INTEGER)
+LANGUAGE plpgsql AS $$
+#variable_conflict use_column
+BEGIN
+    IF p_status NOT IN ('in_stock', 'in_use', 'depleted') THEN
+        RAISE EXCEPTION 'Unknown status %', p_status;
+    END IF;
+
+    RETURN QUERY
+    UPDATE inventory AS i SET
+        status = p_status,
+        in_stock_at = CASE WHEN p_status = 'in_stock' THEN u.changed_at ELSE i.in_stock_at END,
+        in_use_at = CASE WHEN p_status = 'in_use' THEN u.changed_at ELSE i.in_use_at END,
+        depleted_at = CASE WHEN p_status = 'depleted' THEN u.changed_at ELSE i.depleted_at END
+    FROM json_to_recordset(p_units) AS u (item_code TEXT, slot INTEGER, changed_at TEXT)
+    WHERE i.item_code = u.item_code AND i.slot = u.slot AND i.status = p_expected
+    RETURNING i.item_code, i.slot;
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION update_inventory_statuses(JSON, TEXT, TEXT) TO anon, authenticated;
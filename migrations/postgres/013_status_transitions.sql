@@ -0,0 +1,31 @@
+-- Enforces the unit state machine in update_inventory_statuses (User Mode
+-- status changes are compare-and-set calls to it). Applied by
+-- `python migrate.py postgres`. A unit enters in_use from in_stock,
+-- depleted from in_use, and in_stock from depleted (restock) or in_use
+-- (put back); any other move is rejected.
+
+CREATE OR REPLACE FUNCTION update_inventory_statuses(p_units JSON, p_status TEXT, p_expected TEXT)
+RETURNS TABLE (item_code TEXT, slot INTEGER)
+LANGUAGE plpgsql AS $$
+#variable_conflict use_column
+BEGIN
+    IF NOT (p_status, p_expected) IN (
+        ('in_use', 'in_stock'),
+        ('depleted', 'in_use'),
+        ('in_stock', 'depleted'),
+        ('in_stock', 'in_use')
+    ) THEN
+        RAISE EXCEPTION 'A unit cannot go from % to %', p_expected, p_status;
+    END IF;
+
+    RETURN QUERY
+    UPDATE inventory AS i SET
+        status = p_status,
+        in_stock_at = CASE WHEN p_status = 'in_stock' THEN u.changed_at ELSE i.in_stock_at END,
+        in_use_at = CASE WHEN p_status = 'in_use' THEN u.changed_at ELSE i.in_use_at END,
+        depleted_at = CASE WHEN p_status = 'depleted' THEN u.changed_at ELSE i.depleted_at END
+    FROM json_to_recordset(p_units) AS u (item_code TEXT, slot INTEGER, changed_at TEXT)
+    WHERE i.item_code = u.item_code AND i.slot = u.slot AND i.status = p_expected
+    RETURNING i.item_code, i.slot;
+END;
+$$;
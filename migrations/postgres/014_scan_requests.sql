@@ -0,0 +1,98 @@
+-- Idempotency keys of scan writes (Truck Mode receives and User Mode status
+-- changes). Applied by `python migrate.py postgres`. A write whose request
+-- id is already in scan_requests is not applied again; the outcome recorded
+-- the first time is returned instead, so retries and double scans are
+-- no-ops. update_inventory_statuses takes the id as `request_id` in each
+-- element of `p_units`; receive_truck_items takes `p_request_ids`, in the
+-- order of `p_item_ids`. Writes without ids behave as before.
+
+CREATE TABLE IF NOT EXISTS scan_requests (
+    request_id TEXT PRIMARY KEY,
+    applied BOOLEAN NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS scan_requests_created_at_idx ON scan_requests (created_at);
+
+GRANT SELECT, INSERT, DELETE ON scan_requests TO anon, authenticated;
+
+CREATE OR REPLACE FUNCTION update_inventory_statuses(p_units JSON, p_status TEXT, p_expected TEXT)
+RETURNS TABLE (item_code TEXT, slot INTEGER)
+LANGUAGE plpgsql AS $$
+#variable_conflict use_column
+BEGIN
+    IF NOT (p_status, p_expected) IN (
+        ('in_use', 'in_stock'),
+        ('depleted', 'in_use'),
+        ('in_stock', 'depleted'),
+        ('in_stock', 'in_use')
+    ) THEN
+        RAISE EXCEPTION 'A unit cannot go from % to %', p_expected, p_status;
+    END IF;
+
+    RETURN QUERY
+    WITH units AS (
+        SELECT * FROM json_to_recordset(p_units) AS u (item_code TEXT, slot INTEGER, changed_at TEXT, request_id TEXT)
+    ), repeated AS (
+        SELECT u.item_code, u.slot, r.applied
+        FROM units AS u JOIN scan_requests AS r ON r.request_id = u.request_id
+    ), updated AS (
+        UPDATE inventory AS i SET
+            status = p_status,
+            in_stock_at = CASE WHEN p_status = 'in_stock' THEN u.changed_at ELSE i.in_stock_at END,
+            in_use_at = CASE WHEN p_status = 'in_use' THEN u.changed_at ELSE i.in_use_at END,
+            depleted_at = CASE WHEN p_status = 'depleted' THEN u.changed_at ELSE i.depleted_at END
+        FROM units AS u
+        WHERE i.item_code = u.item_code AND i.slot = u.slot AND i.status = p_expected
+          AND NOT EXISTS (SELECT 1 FROM scan_requests AS r WHERE r.request_id = u.request_id)
+        RETURNING i.item_code, i.slot
+    ), recorded AS (
+        INSERT INTO scan_requests (request_id, applied)
+        SELECT u.request_id, EXISTS (SELECT 1 FROM updated AS d WHERE d.item_code = u.item_code AND d.slot = u.slot)
+        FROM units AS u
+        WHERE u.request_id IS NOT NULL
+        ON CONFLICT (request_id) DO NOTHING
+    )
+    SELECT d.item_code, d.slot FROM updated AS d
+    UNION ALL
+    SELECT p.item_code, p.slot FROM repeated AS p WHERE p.applied;
+END;
+$$;
+
+DROP FUNCTION IF EXISTS receive_truck_items(BIGINT, BIGINT[], TEXT, TEXT);
+
+CREATE FUNCTION receive_truck_items(
+    p_truck_id BIGINT,
+    p_item_ids BIGINT[],
+    p_received_by TEXT,
+    p_received_at TEXT,
+    p_request_ids TEXT[] DEFAULT NULL
+)
+RETURNS BIGINT[]
+LANGUAGE sql AS $$
+    WITH requests AS (
+        SELECT item_id, request_id FROM unnest(p_item_ids, p_request_ids) AS r (item_id, request_id)
+    ), repeated AS (
+        SELECT q.item_id, s.applied
+        FROM requests AS q JOIN scan_requests AS s ON s.request_id = q.request_id
+    ), received AS (
+        UPDATE anticipated_items SET status = 'scanned', scanned_at = p_received_at
+        WHERE truck_id = p_truck_id AND status = 'pending' AND id = ANY (p_item_ids)
+          AND id NOT IN (SELECT item_id FROM repeated)
+        RETURNING id, item_code, slot
+    ), added AS (
+        INSERT INTO inventory (item_code, slot, status, added_by, added_at, in_stock_at, truck_id)
+        SELECT item_code, slot, 'in_stock', p_received_by, p_received_at, p_received_at, p_truck_id
+        FROM received
+    ), recorded AS (
+        INSERT INTO scan_requests (request_id, applied)
+        SELECT q.request_id, q.item_id IN (SELECT id FROM received)
+        FROM requests AS q
+        WHERE q.request_id IS NOT NULL
+        ON CONFLICT (request_id) DO NOTHING
+    )
+    SELECT coalesce(array_agg(id), '{}')
+    FROM (SELECT id FROM received UNION ALL SELECT item_id FROM repeated WHERE applied) AS done;
+$$;
+
+GRANT EXECUTE ON FUNCTION receive_truck_items(BIGINT, BIGINT[], TEXT, TEXT, TEXT[]) TO anon, authenticated;
@@ -0,0 +1,27 @@
+-- Adds one inventory unit under an idempotency key (Truck Mode Emergency
+-- Add). Applied by `python migrate.py postgres`. Like the scan writes in
+-- 014, an add whose request id is already in scan_requests is not made
+-- again and its first outcome is returned, so a double submit or a retry
+-- after a lost response cannot create a second unit.
+
+CREATE OR REPLACE FUNCTION add_inventory_item(p_row JSON, p_request_id TEXT)
+RETURNS BOOLEAN
+LANGUAGE plpgsql AS $$
+DECLARE
+    repeated BOOLEAN;
+BEGIN
+    SELECT applied INTO repeated FROM scan_requests WHERE request_id = p_request_id;
+    IF FOUND THEN
+        RETURN repeated;
+    END IF;
+
+    INSERT INTO inventory (item_code, slot, status, added_by, added_at, in_stock_at)
+    SELECT item_code, slot, status, added_by, added_at, in_stock_at
+    FROM json_to_record(p_row) AS r (item_code TEXT, slot INTEGER, status TEXT, added_by TEXT, added_at TEXT, in_stock_at TEXT);
+
+    INSERT INTO scan_requests (request_id, applied) VALUES (p_request_id, TRUE);
+    RETURN TRUE;
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION add_inventory_item(JSON, TEXT) TO anon, authenticated;
@@ -0,0 +1,54 @@
+-- Tables as they were at the first release. Later columns are added by
+-- 002; database files created before migrations were tracked already have
+-- these tables and skip the CREATEs.
+
+CREATE TABLE IF NOT EXISTS allowed_items (
+    item_name TEXT PRIMARY KEY UNIQUE NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY UNIQUE NOT NULL,
+    password TEXT NOT NULL,
+    role TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS inventory (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    item_code TEXT NOT NULL,
+    slot INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    added_by TEXT NOT NULL,
+    added_at TEXT NOT NULL,
+    in_stock_at TEXT,
+    in_use_at TEXT,
+    depleted_at TEXT,
+    UNIQUE (item_code, slot)
+);
+
+CREATE TABLE IF NOT EXISTS anticipated_trucks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    truck_name TEXT NOT NULL,
+    created_by TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    status TEXT DEFAULT 'pending'
+);
+
+CREATE TABLE IF NOT EXISTS anticipated_items (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    truck_id INTEGER NOT NULL,
+    item_code TEXT NOT NULL,
+    slot INTEGER NOT NULL,
+    barcode_label TEXT NOT NULL,
+    status TEXT DEFAULT 'pending',
+    scanned_at TEXT,
+    FOREIGN KEY (truck_id) REFERENCES anticipated_trucks (id)
+);
+
+CREATE TABLE IF NOT EXISTS analytics_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    truck_id INTEGER NOT NULL,
+    items_processed INTEGER NOT NULL,
+    closed_by TEXT NOT NULL,
+    closed_at TEXT NOT NULL,
+    FOREIGN KEY (truck_id) REFERENCES anticipated_trucks (id)
+);
@@ -0,0 +1,9 @@
+-- Columns added after the first release. SQLite has no ADD COLUMN IF NOT
+-- EXISTS; the runner skips any of these a pre-migration file already has.
+
+ALTER TABLE inventory ADD COLUMN truck_id INTEGER;
+ALTER TABLE inventory ADD COLUMN updated_at TEXT;
+ALTER TABLE anticipated_trucks ADD COLUMN day_of_week TEXT;
+ALTER TABLE anticipated_items ADD COLUMN updated_at TEXT;
+ALTER TABLE analytics_history ADD COLUMN items_missing INTEGER DEFAULT 0;
+ALTER TABLE analytics_history ADD COLUMN total_items INTEGER DEFAULT 0;
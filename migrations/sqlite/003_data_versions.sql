@@ -0,0 +1,108 @@
+-- Per-table version counters, the SQLite side of
+-- migrations/postgres/001_data_versions.sql. SQLite has no statement-level
+-- triggers, so these fire per row; readers only compare versions for
+-- equality, so the larger jumps do not matter.
+
+CREATE TABLE IF NOT EXISTS data_versions (
+    table_name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT
+);
+
+INSERT OR IGNORE INTO data_versions (table_name) VALUES
+    ('allowed_items'),
+    ('users'),
+    ('inventory'),
+    ('anticipated_trucks'),
+    ('anticipated_items'),
+    ('analytics_history');
+
+CREATE TRIGGER IF NOT EXISTS allowed_items_insert_data_version AFTER INSERT ON allowed_items
+BEGIN
+    UPDATE data_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE table_name = 'allowed_items';
+END;
+
+CREATE TRIGGER IF NOT EXISTS allowed_items_update_data_version AFTER UPDATE ON allowed_items
+BEGIN
+    UPDATE data_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE table_name = 'allowed_items';
+END;
+
+CREATE TRIGGER IF NOT EXISTS allowed_items_delete_data_version AFTER DELETE ON allowed_items
+BEGIN
+    UPDATE data_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE table_name = 'allowed_items';
+END;
+
+CREATE TRIGGER IF NOT EXISTS users_insert_data_version AFTER INSERT ON users
+BEGIN
+    UPDATE data_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE table_name = 'users';
+END;
+
+CREATE TRIGGER IF NOT EXISTS users_update_data_version AFTER UPDATE ON users
+BEGIN
+    UPDATE data_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE table_name = 'users';
+END;
+
+CREATE TRIGGER IF NOT EXISTS users_delete_data_version AFTER DELETE ON users
+BEGIN
+    UPDATE data_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE table_name = 'users';
+END;
+
+CREATE TRIGGER IF NOT EXISTS inventory_insert_data_version AFTER INSERT ON inventory
+BEGIN
+    UPDATE data_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE table_name = 'inventory';
+END;
+
+CREATE TRIGGER IF NOT EXISTS inventory_update_data_version AFTER UPDATE ON inventory
+BEGIN
+    UPDATE data_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE table_name = 'inventory';
+END;
+
+CREATE TRIGGER IF NOT EXISTS inventory_delete_data_version AFTER DELETE ON inventory
+BEGIN
+    UPDATE data_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE table_name = 'inventory';
+END;
+
+CREATE TRIGGER IF NOT EXISTS anticipated_trucks_insert_data_version AFTER INSERT ON anticipated_trucks
+BEGIN
+    UPDATE data_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE table_name = 'anticipated_trucks';
+END;
+
+CREATE TRIGGER IF NOT EXISTS anticipated_trucks_update_data_version AFTER UPDATE ON anticipated_trucks
+BEGIN
+    UPDATE data_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE table_name = 'anticipated_trucks';
+END;
+
+CREATE TRIGGER IF NOT EXISTS anticipated_trucks_delete_data_version AFTER DELETE ON anticipated_trucks
+BEGIN
+    UPDATE data_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE table_name = 'anticipated_trucks';
+END;
+
+CREATE TRIGGER IF NOT EXISTS anticipated_items_insert_data_version AFTER INSERT ON anticipated_items
+BEGIN
+    UPDATE data_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE table_name = 'anticipated_items';
+END;
+
+CREATE TRIGGER IF NOT EXISTS anticipated_items_update_data_version AFTER UPDATE ON anticipated_items
+BEGIN
+    UPDATE data_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE table_name = 'anticipated_items';
+END;
+
+CREATE TRIGGER IF NOT EXISTS anticipated_items_delete_data_version AFTER DELETE ON anticipated_items
+BEGIN
+    UPDATE data_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE table_name = 'anticipated_items';
+END;
+
+CREATE TRIGGER IF NOT EXISTS analytics_history_insert_data_version AFTER INSERT ON analytics_history
+BEGIN
+    UPDATE data_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE table_name = 'analytics_history';
+END;
+
+CREATE TRIGGER IF NOT EXISTS analytics_history_update_data_version AFTER UPDATE ON analytics_history
+BEGIN
+    UPDATE data_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE table_name = 'analytics_history';
+END;
+
+CREATE TRIGGER IF NOT EXISTS analytics_history_delete_data_version AFTER DELETE ON analytics_history
+BEGIN
+    UPDATE data_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE table_name = 'analytics_history';
+END;
@@ -0,0 +1,14 @@
+-- Indexes for the lookups on every scan and every truck screen.
+-- Check they are used with `python migrate.py sqlite --explain`.
+
+-- FIFO: oldest in_stock unit of an item
+CREATE INDEX IF NOT EXISTS inventory_item_status_added_at_idx ON inventory (item_code, status, added_at);
+
+-- Depletion history and the newest depletion
+CREATE INDEX IF NOT EXISTS inventory_depleted_at_idx ON inventory (depleted_at);
+
+-- A truck's items, and its pending ones at close
+CREATE INDEX IF NOT EXISTS anticipated_items_truck_status_idx ON anticipated_items (truck_id, status);
+
+-- Truck Mode label scans
+CREATE INDEX IF NOT EXISTS anticipated_items_barcode_label_idx ON anticipated_items (barcode_label);
@@ -0,0 +1,35 @@
+-- Archive for depleted inventory (see maintenance.py). Rows keep their
+-- inventory id and lifecycle timestamps so analytics can still read them.
+
+CREATE TABLE IF NOT EXISTS inventory_history (
+    id INTEGER PRIMARY KEY,
+    item_code TEXT NOT NULL,
+    slot INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    added_by TEXT NOT NULL,
+    added_at TEXT NOT NULL,
+    in_stock_at TEXT,
+    in_use_at TEXT,
+    depleted_at TEXT,
+    truck_id INTEGER,
+    archived_at TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS inventory_history_depleted_at_idx ON inventory_history (depleted_at);
+
+INSERT OR IGNORE INTO data_versions (table_name) VALUES ('inventory_history');
+
+CREATE TRIGGER IF NOT EXISTS inventory_history_insert_data_version AFTER INSERT ON inventory_history
+BEGIN
+    UPDATE data_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE table_name = 'inventory_history';
+END;
+
+CREATE TRIGGER IF NOT EXISTS inventory_history_update_data_version AFTER UPDATE ON inventory_history
+BEGIN
+    UPDATE data_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE table_name = 'inventory_history';
+END;
+
+CREATE TRIGGER IF NOT EXISTS inventory_history_delete_data_version AFTER DELETE ON inventory_history
+BEGIN
+    UPDATE data_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE table_name = 'inventory_history';
+END;
@@ -0,0 +1,31 @@
+-- Per-truck, per-item status counts for closed trucks (see maintenance.py
+-- compact). Once a truck is compacted its dashboard reads these rows, and
+-- its per-unit anticipated_items rows may be pruned.
+
+ALTER TABLE anticipated_trucks ADD COLUMN compacted_at TEXT;
+
+CREATE TABLE IF NOT EXISTS anticipated_item_counts (
+    truck_id INTEGER NOT NULL,
+    item_code TEXT NOT NULL,
+    status TEXT NOT NULL,
+    item_count INTEGER NOT NULL,
+    PRIMARY KEY (truck_id, item_code, status),
+    FOREIGN KEY (truck_id) REFERENCES anticipated_trucks (id)
+);
+
+INSERT OR IGNORE INTO data_versions (table_name) VALUES ('anticipated_item_counts');
+
+CREATE TRIGGER IF NOT EXISTS anticipated_item_counts_insert_data_version AFTER INSERT ON anticipated_item_counts
+BEGIN
+    UPDATE data_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE table_name = 'anticipated_item_counts';
+END;
+
+CREATE TRIGGER IF NOT EXISTS anticipated_item_counts_update_data_version AFTER UPDATE ON anticipated_item_counts
+BEGIN
+    UPDATE data_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE table_name = 'anticipated_item_counts';
+END;
+
+CREATE TRIGGER IF NOT EXISTS anticipated_item_counts_delete_data_version AFTER DELETE ON anticipated_item_counts
+BEGIN
+    UPDATE data_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE table_name = 'anticipated_item_counts';
+END;
@@ -0,0 +1,13 @@
+-- Item counts per truck, item and status for the Truck Summary Dashboard.
+-- Open trucks are counted from anticipated_items; compacted trucks read
+-- their stored counts, since their unit rows may be pruned.
+
+CREATE VIEW IF NOT EXISTS truck_item_status_counts AS
+SELECT i.truck_id, i.item_code, i.status, COUNT(*) AS item_count
+FROM anticipated_items i
+JOIN anticipated_trucks t ON t.id = i.truck_id
+WHERE t.compacted_at IS NULL
+GROUP BY i.truck_id, i.item_code, i.status
+UNION ALL
+SELECT truck_id, item_code, status, item_count
+FROM anticipated_item_counts;
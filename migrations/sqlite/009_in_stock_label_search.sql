@@ -0,0 +1,7 @@
+-- Index for the Truck Mode reprint search, which matches the start of an
+-- in-stock item's code ignoring case. LIKE is case-insensitive in SQLite and
+-- can only use an index with NOCASE collation.
+
+CREATE INDEX IF NOT EXISTS inventory_in_stock_item_code_idx
+ON inventory (item_code COLLATE NOCASE)
+WHERE status = 'in_stock';
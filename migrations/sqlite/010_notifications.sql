@@ -0,0 +1,29 @@
+-- Messages admins post to the top of User, Truck and Admin Mode (see the
+-- Notifications page). At most one row per section is kept.
+
+CREATE TABLE IF NOT EXISTS notifications (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    section TEXT NOT NULL,
+    message TEXT NOT NULL,
+    sender TEXT NOT NULL,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS notifications_section_created_at_idx ON notifications (section, created_at);
+
+INSERT OR IGNORE INTO data_versions (table_name) VALUES ('notifications');
+
+CREATE TRIGGER IF NOT EXISTS notifications_insert_data_version AFTER INSERT ON notifications
+BEGIN
+    UPDATE data_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE table_name = 'notifications';
+END;
+
+CREATE TRIGGER IF NOT EXISTS notifications_update_data_version AFTER UPDATE ON notifications
+BEGIN
+    UPDATE data_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE table_name = 'notifications';
+END;
+
+CREATE TRIGGER IF NOT EXISTS notifications_delete_data_version AFTER DELETE ON notifications
+BEGIN
+    UPDATE data_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE table_name = 'notifications';
+END;
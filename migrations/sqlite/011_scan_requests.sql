@@ -0,0 +1,12 @@
+-- Idempotency keys of scan writes (Truck Mode receives and User Mode status
+-- changes). A write whose request id is already here is not applied again;
+-- the outcome recorded the first time is returned instead, so retries and
+-- double scans are no-ops. Pruned by `python maintenance.py prune-requests`.
+
+CREATE TABLE IF NOT EXISTS scan_requests (
+    request_id TEXT PRIMARY KEY,
+    applied INTEGER NOT NULL,
+    created_at TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS scan_requests_created_at_idx ON scan_requests (created_at);
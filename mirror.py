@@ -0,0 +1,173 @@
+# mirror.py
+import datetime
+import logging
+import threading
+import time
+
+from local_db import ConnectionPool, primary_key, setup_database, table_columns
+from sync import SYNCED_TABLES, fetch_all_rows, fetch_changes
+
+logger = logging.getLogger(__name__)
+
+MIRROR_DB_NAME = "mirror.db"
+
+# Users are not mirrored so passwords never land on local disk. Neither is
+# inventory_history: every archive run moves its version, it is too big to
+# reload whole each time, and only the analytics reads use it, so those go to
+# Supabase instead.
+MIRRORED_TABLES = (
+    "allowed_items",
+    "inventory",
+    "anticipated_trucks",
+    "anticipated_items",
+    "anticipated_item_counts",
+    "analytics_history",
+)
+
+
+class SQLiteMirror:
+    """Read-through local SQLite copy of the Supabase tables.
+
+    A background thread refreshes the mirror every `refresh_interval`
+    seconds: one query on `data_versions`, then a delta sync for inventory
+    and anticipated_items and a full reload for any small table whose
+    version moved. Reads call `ensure_fresh` first, so they never serve data
+    older than `max_staleness` seconds while Supabase is reachable. Writes
+    still go to Supabase; call `mark_stale` after one so the next read
+    catches up.
+    """
+
+    def __init__(self, client, db_name=MIRROR_DB_NAME, max_staleness=30, refresh_interval=5):
+        self.client = client
+        self.db_name = db_name
+        self.max_staleness = max_staleness
+        self.refresh_interval = refresh_interval
+        self.synced_at = None
+        self.failed_at = None
+        self.versions = {}
+        self.last_error = None
+        self._stale = True
+        self._lock = threading.Lock()
+        self._thread = None
+        self.pool = ConnectionPool(db_name)
+
+        setup_database(db_name)
+        with self.pool.connection() as conn, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS mirror_state (
+                    table_name TEXT PRIMARY KEY,
+                    version INTEGER,
+                    watermark TEXT
+                )
+            """)
+
+    def start(self):
+        """Starts the background refresh thread (once)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="sqlite-mirror", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Mirror refresh failed")
+            time.sleep(self.refresh_interval)
+
+    def mark_stale(self):
+        self._stale = True
+
+    def age(self):
+        """Seconds since the last successful refresh, or None if never synced."""
+        if self.synced_at is None:
+            return None
+        return time.monotonic() - self.synced_at
+
+    def ensure_fresh(self):
+        age = self.age()
+        if self._stale or age is None or age > self.max_staleness:
+            if self.synced_at is not None and self.failed_at is not None and time.monotonic() - self.failed_at < self.refresh_interval:
+                # Supabase was just unreachable; leave retrying to the background thread
+                return
+            try:
+                self.refresh()
+            except Exception:
+                # Serve the last good copy while Supabase is unreachable
+                if self.synced_at is None:
+                    raise
+                logger.exception("Mirror refresh failed; serving stale data")
+
+    def refresh(self):
+        with self._lock:
+            self._stale = False
+            try:
+                # Supabase: One small query tells us which tables moved
+                rows = self.client.from_("data_versions").select("table_name, version").execute().data
+                versions = {row["table_name"]: row["version"] for row in rows}
+
+                with self.pool.connection() as conn:
+                    state = {
+                        row["table_name"]: row
+                        for row in conn.execute("SELECT table_name, version, watermark FROM mirror_state")
+                    }
+                    for table in MIRRORED_TABLES:
+                        current = state.get(table)
+                        if current is not None and current["version"] == versions.get(table):
+                            continue
+                        watermark = current["watermark"] if current is not None else None
+                        self._sync_table(conn, table, versions.get(table), watermark)
+            except Exception as e:
+                self.last_error = str(e)
+                self.failed_at = time.monotonic()
+                raise
+
+            self.versions = versions
+            self.last_error = None
+            self.failed_at = None
+            self.synced_at = time.monotonic()
+
+    def _sync_table(self, conn, table, version, watermark):
+        columns = table_columns(conn, table)
+        if table in SYNCED_TABLES:
+            changes = fetch_changes(self.client, table, watermark)
+            rows, deleted, full = changes["rows"], changes["deleted"], changes["full"]
+            watermark = changes["watermark"]
+        else:
+            # Supabase: Small tables are reloaded whole, in key order so pages never overlap
+            key = primary_key(conn, table)
+
+            def query():
+                q = self.client.from_(table).select("*")
+                for column in key:
+                    q = q.order(column)
+                return q
+
+            rows = fetch_all_rows(query)
+            deleted, full = [], True
+
+        with conn:
+            if full:
+                conn.execute(f"DELETE FROM {table}")
+            for row_id in deleted:
+                conn.execute(f"DELETE FROM {table} WHERE id = ?", (row_id,))
+            if rows:
+                names = [c for c in columns if c in rows[0]]
+                conn.executemany(
+                    f"INSERT OR REPLACE INTO {table} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})",
+                    [tuple(row.get(c) for c in names) for row in rows],
+                )
+            conn.execute(
+                "INSERT OR REPLACE INTO mirror_state (table_name, version, watermark) VALUES (?, ?, ?)",
+                (table, version, watermark),
+            )
+
+    def describe_freshness(self):
+        age = self.age()
+        if age is None:
+            return "Local mirror has not synced yet."
+        text = f"Local mirror synced {datetime.timedelta(seconds=round(age))} ago."
+        if self.last_error:
+            text += f" Last refresh failed: {self.last_error}"
+        return text
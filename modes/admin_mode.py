@@ -0,0 +1,290 @@
+# modes/admin_mode.py
+"""Admin Mode page: inventory summaries, allowed items, users, clearing inventory and the scan queue."""
+import functools
+
+import pandas as pd
+import streamlit as st
+from streamlit.errors import StreamlitAPIException
+
+from core import (
+    check_login, get_allowed_items, get_inventory, get_users, mark_data_changed, repo,
+    show_mirror_freshness, show_notification, write_queue,
+)
+
+if "pending_delete_user" not in st.session_state:
+    st.session_state.pending_delete_user = None
+
+
+def admin_fragment(func):
+    """Runs an Admin Mode section as an st.fragment, so using it reruns only that section.
+
+    A fragment rerun skips app.py, so the per-run version memo is reset
+    here to make the section's cached reads re-check versions.
+    """
+    @st.fragment
+    @functools.wraps(func)
+    def section(*args, **kwargs):
+        mark_data_changed()
+        return func(*args, **kwargs)
+    return section
+
+def rerun_section():
+    """Reruns just the current section; falls back to a full rerun when the section ran as part of one."""
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
+
+@admin_fragment
+def admin_product_summary():
+    """Counts per item and status, plus depletions in the last week."""
+    st.subheader("Product Summary")
+    # Fetch data for product summary
+    try:
+        summary_df_raw = pd.DataFrame(get_inventory())
+        
+        if not summary_df_raw.empty:
+            # Convert to datetime and ensure timezone-aware
+            summary_df_raw['depleted_at'] = pd.to_datetime(summary_df_raw['depleted_at'], errors='coerce')
+            summary_df_raw['depleted_at'] = summary_df_raw['depleted_at'].dt.tz_localize('UTC', nonexistent='NaT', ambiguous='NaT')
+
+            # Pivot table to get counts by status
+            summary_df = summary_df_raw.groupby('item_code')['status'].value_counts().unstack(fill_value=0)
+
+            # Calculate "Depleted This Week"
+            one_week_ago = pd.Timestamp.now(tz='UTC') - pd.Timedelta(days=7)
+            depleted_this_week = summary_df_raw[
+                (summary_df_raw['status'] == 'depleted') &
+                (summary_df_raw['depleted_at'] >= one_week_ago)
+            ].groupby('item_code')['status'].count().rename('Depleted This Week')
+
+            # Combine the DataFrames
+            final_summary_df = (
+                summary_df
+                .reindex(columns=['in_stock', 'in_use', 'depleted'], fill_value=0)
+                .rename(columns={'in_stock': 'In Stock', 'in_use': 'In Use', 'depleted': 'Depleted Total'})
+                .join(depleted_this_week, how='left')
+                .fillna(0)
+            )
+
+            st.dataframe(final_summary_df)
+        else:
+            st.info("No inventory data to display.")
+    except Exception as e:
+        st.error(f"Error fetching product summary: {e}")
+
+@admin_fragment
+def admin_inventory_overview():
+    """Every live inventory unit with its stage durations."""
+    st.subheader("Inventory Overview")
+    # Fetch all inventory data
+    try:
+        df = pd.DataFrame(get_inventory())
+
+        if not df.empty:
+            # Convert timestamp columns to datetime objects
+            df["in_stock_at"] = pd.to_datetime(df["in_stock_at"])
+            df["in_use_at"] = pd.to_datetime(df["in_use_at"])
+            df["depleted_at"] = pd.to_datetime(df["depleted_at"])
+            
+            # Calculate durations in days
+            df["Days In Stock"] = (df["in_use_at"] - df["in_stock_at"]).dt.days
+            df["Days In Use"] = (df["depleted_at"] - df["in_use_at"]).dt.days
+            df["Total Days"] = (df["depleted_at"] - df["in_stock_at"]).dt.days
+            
+            st.dataframe(df)
+        else:
+            st.info("No items in inventory to display.")
+    except Exception as e:
+        st.error(f"Error fetching inventory overview: {e}")
+
+@admin_fragment
+def admin_allowed_items():
+    """Adds and deletes allowed items."""
+    st.subheader("Allowed Items")
+    allowed_items_list = get_allowed_items()
+
+    with st.form("add_allowed_item", clear_on_submit=True):
+        new_item = st.text_input("New item name", placeholder="e.g., MAYO_SAUCE")
+        if st.form_submit_button("Add New Item"):
+            if new_item.strip():
+                try:
+                    # Insert a new allowed item
+                    repo.add_allowed_item(new_item.strip())
+                    st.success(f"Added allowed item: **{new_item.strip()}**")
+                    mark_data_changed()
+                    rerun_section()
+                except Exception as e:
+                    st.error(f"Item `{new_item.strip()}` already exists. Details: {e}")
+            else:
+                st.warning("Please enter an item name.")
+                
+    st.markdown("---")
+    
+    # Deletion logic separate from the add form
+    if allowed_items_list:
+        items_to_delete = st.multiselect(
+            "Select items to delete:", allowed_items_list, key="delete_items"
+        )
+        if st.button("Delete Selected Items", key="delete_selected_items"):
+            if items_to_delete:
+                try:
+                    # Delete selected items
+                    repo.delete_allowed_items(items_to_delete)
+                    st.success(f"Deleted items: **{', '.join(items_to_delete)}**")
+                    mark_data_changed()
+                    rerun_section()
+                except Exception as e:
+                    st.error(f"Error deleting items: {e}")
+            else:
+                st.warning("Please select at least one item to delete.")
+
+@admin_fragment
+def admin_users():
+    """Adds and deletes users."""
+    st.subheader("User Management")
+    users_data = get_users()
+    df_users = pd.DataFrame(users_data)
+    st.dataframe(df_users)
+    
+    with st.form("add_user", clear_on_submit=True):
+        nu = st.text_input("New username")
+        npw = st.text_input("New password", type="password")
+        nrole = st.selectbox("Role", ["truck", "admin"])
+        if st.form_submit_button("Add User"):
+            if nu.strip() and npw.strip():
+                try:
+                    # Insert a new user
+                    repo.add_user(nu.strip(), npw.strip(), nrole)
+                    st.success(f"User **{nu.strip()}** added.")
+                    mark_data_changed()
+                    rerun_section()
+                except Exception as e:
+                    st.error(f"User `{nu.strip()}` already exists. Details: {e}")
+            else:
+                st.warning("Please fill in both username and password.")
+
+    # Users to delete (excluding the current admin)
+    users_to_delete = [user['username'] for user in users_data if user['username'] != st.session_state.admin_username]
+    
+    if users_to_delete:
+        user_to_delete = st.selectbox("Select user to delete:", users_to_delete, key="user_select_delete")
+        if st.button("Delete Selected User"):
+            st.session_state.pending_delete_user = user_to_delete
+    
+    if st.session_state.pending_delete_user:
+        ud = st.session_state.pending_delete_user
+        st.warning(f"Are you sure you want to delete user: **{ud}**?")
+        c1, c2 = st.columns(2)
+        if c1.button("Yes, delete"):
+            # Delete the selected user
+            repo.delete_user(ud)
+            st.success(f"Deleted user **{ud}**.")
+            st.session_state.pending_delete_user = None
+            mark_data_changed()
+            rerun_section()
+        if c2.button("Cancel"):
+            st.session_state.pending_delete_user = None
+
+@admin_fragment
+def admin_clear_inventory():
+    """Deletes all live inventory after a confirmation."""
+    st.subheader("Clear Inventory")
+    if "confirm_clear_inventory" not in st.session_state:
+        st.session_state.confirm_clear_inventory = False
+
+    if not st.session_state.confirm_clear_inventory:
+        if st.button("Clear Entire Inventory", type="primary"):
+            st.session_state.confirm_clear_inventory = True
+    else:
+        st.warning("Are you sure you want to clear the entire inventory? This cannot be undone.")
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("Yes, Clear"):
+                # Delete every row in one statement
+                repo.clear_inventory()
+
+                st.success("Inventory cleared successfully!")
+                st.session_state.confirm_clear_inventory = False
+                mark_data_changed()
+                rerun_section()
+        with col2:
+            if st.button("Cancel"):
+                st.session_state.confirm_clear_inventory = False
+
+def format_seconds(seconds):
+    if seconds is None:
+        return "—"
+    return f"{seconds * 1000:.0f} ms" if seconds < 1 else f"{seconds:.1f} s"
+
+@admin_fragment
+def admin_scan_queue():
+    """Depth and flush latency of the scan journal, and the scans that conflicted on replay."""
+    st.subheader("Scan Queue")
+    if not write_queue:
+        st.info("Scans are written straight to the backend (USE_WRITE_BEHIND is off).")
+        return
+
+    stats = write_queue.stats()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Queued", stats["depth"])
+    col2.metric("Oldest queued", format_seconds(stats["oldest_age"]))
+    col3.metric("Last flush", format_seconds(stats["last_latency"]))
+    col4.metric("Avg flush (last 50)", format_seconds(stats["avg_latency"]))
+    st.caption(f"Slowest recent flush: {format_seconds(stats['max_latency'])}; last flush finished {format_seconds(stats['since_flush'])} ago.")
+    if stats["offline"]:
+        st.error(f"Offline, retrying ({stats['attempts']} attempts): {stats['last_error']}")
+
+    if st.button("Refresh"):
+        rerun_section()
+
+    st.markdown("**Conflicts** (scans the backend did not apply, usually because another station got there first)")
+    rejected = write_queue.list_rejected()
+    if not rejected:
+        st.write("None.")
+        return
+    st.dataframe(pd.DataFrame(rejected)[["kind", "item_code", "slot", "expected_status", "new_status", "changed_at", "reason"]])
+    if st.button("Dismiss conflicts"):
+        write_queue.clear_rejected()
+        rerun_section()
+
+def admin_mode():
+    st.header("Admin Mode")
+    show_notification("admin")
+
+    if not st.session_state.admin_logged_in:
+        username = st.text_input("Admin Username")
+        password = st.text_input("Admin Password", type="password")
+        if st.button("Login as Admin"):
+            is_valid, role = check_login(username, password)
+            if is_valid and role == 'admin':
+                st.session_state.admin_logged_in = True
+                st.session_state.admin_username = username
+                st.success("Admin logged in.")
+            elif is_valid is not None:
+                st.error("Invalid admin credentials.")
+        return
+
+    st.write(f"Logged in as **{st.session_state.admin_username}** (admin)")
+    if st.button("Logout"):
+        st.session_state.admin_logged_in = False
+        st.session_state.admin_username = ""
+        st.session_state.pending_delete_user = None
+    show_mirror_freshness()
+
+    st.markdown("---")
+
+    # Only the chosen section queries and renders; each one is a fragment
+    sections = {
+        "Product Summary": admin_product_summary,
+        "Inventory Overview": admin_inventory_overview,
+        "Allowed Items": admin_allowed_items,
+        "User Management": admin_users,
+        "Clear Inventory": admin_clear_inventory,
+        "Scan Queue": admin_scan_queue,
+    }
+    section = st.radio("Section", list(sections), horizontal=True, key="admin_section", label_visibility="collapsed")
+    sections[section]()
+
+
+admin_mode()
@@ -0,0 +1,170 @@
+# modes/analytics_mode.py
+"""Analytics Mode page: truck history, item lifespans and depletion windows."""
+import pandas as pd
+import streamlit as st
+
+from analytics import depletion_matrix
+from core import check_login, get_truck_names, repo, show_mirror_freshness, truck_picker
+
+
+def analytics_mode():
+    st.header("Analytics Mode")
+
+    # --- Admin login check ---
+    if not st.session_state.get("admin_logged_in", False):
+        username = st.text_input("Admin Username")
+        password = st.text_input("Admin Password", type="password")
+        
+        if st.button("Login as Admin"):
+            is_valid, role = check_login(username, password)
+            if is_valid and role == "admin":
+                st.session_state.admin_logged_in = True
+                st.session_state.admin_username = username
+            elif is_valid is not None:
+                st.error("Invalid credentials.")
+        return  # Stop rendering if not logged in
+
+    show_mirror_freshness()
+
+    # --- Truck History ---
+    st.subheader("Truck History")
+    
+    try:
+        truck_info = truck_picker("analytics", "Select a truck to view history:", default_status="All")
+    except Exception as e:
+        st.error(f"Error fetching truck data: {e}")
+        truck_info = None
+
+    if truck_info is not None:
+        t_id = truck_info['id']
+        selected_truck_name = f"{truck_info['truck_name']} (ID {t_id})"
+
+        try:
+            # Truck creation info comes with the picked truck row
+            created_by, created_at = truck_info['created_by'], truck_info['created_at']
+
+            # Fetch users who scanned items for this truck
+            scanned_users = repo.list_truck_receivers(t_id)
+            scanned_by = ", ".join(scanned_users) if scanned_users else "No scans yet"
+
+            # Fetch truck closure info
+            closed_info = repo.get_truck_closure(t_id)
+            closed_by, closed_at = (closed_info['closed_by'], closed_info['closed_at']) if closed_info else ("Not closed yet", "")
+
+        except Exception as e:
+            st.error(f"Error fetching truck history details: {e}")
+
+
+        except Exception as e:
+            st.error(f"Error fetching truck history details: {e}")
+            created_by, created_at = "Error", "Error"
+            scanned_by = "Error"
+            closed_by, closed_at = "Error", ""
+
+        st.markdown(f"""
+        **Truck:** {selected_truck_name}  
+        **Created by:** {created_by} at {created_at}  
+        **Scanned by:** {scanned_by}  
+        **Closed by:** {closed_by} {f'at {closed_at}' if closed_at else ''}
+        """)
+    else:
+        st.info("No trucks found.")
+
+    # --- Item Lifespan Analysis ---
+    st.markdown("---")
+    st.subheader("Item Lifespan Analysis")
+
+    try:
+        # Fetch every depletion once; lifespan and the timeline below both use it
+        depleted_items_data = repo.list_depletions()
+        depleted_items = pd.DataFrame(depleted_items_data)
+
+        lifespans = depleted_items.dropna(subset=['in_use_at']) if not depleted_items.empty else depleted_items
+        if not lifespans.empty:
+            lifespans = lifespans.assign(
+                duration_days=(pd.to_datetime(lifespans['depleted_at']) - pd.to_datetime(lifespans['in_use_at'])).dt.days
+            )
+
+            avg_lifespan = lifespans.groupby('item_code')['duration_days'].mean().reset_index()
+            avg_lifespan.rename(columns={'duration_days': 'Average Lifespan (Days)'}, inplace=True)
+            st.dataframe(avg_lifespan)
+        else:
+            st.info("Not enough data to calculate item lifespans.")
+    except Exception as e:
+        st.error(f"Error fetching item lifespan data: {e}")
+        depleted_items = pd.DataFrame()
+
+    # --- Depletion Timeline ---
+    st.markdown("---")
+    st.subheader("Depletion Timeline")
+
+    try:
+        # Fetch truck history from analytics_history table
+        history_data = repo.list_truck_closures()
+        truck_history = pd.DataFrame(history_data)
+
+        if not truck_history.empty:
+            # Names of just the trucks in the history, in one query
+            names = get_truck_names(truck_history['truck_id'].unique().tolist())
+            truck_history['truck_name'] = truck_history['truck_id'].map(names).fillna('Deleted truck')
+            truck_history['label'] = (
+                truck_history['truck_name'] + ' (ID ' + truck_history['truck_id'].astype(str) + ') - Closed '
+                + truck_history['closed_at'].astype(str)
+            )
+
+            # One vectorized pass: truck x item depletion counts for the whole history
+            matrix = depletion_matrix(truck_history, depleted_items)
+            truck_history = truck_history.loc[matrix.index].reset_index(drop=True)
+            matrix = matrix.reset_index(drop=True)
+    except Exception as e:
+        st.error(f"Error fetching data for depletion analysis: {e}")
+        truck_history = pd.DataFrame()
+
+    if not truck_history.empty:
+        timeline = matrix.copy()
+        timeline.index = truck_history['label']
+        timeline.index.name = 'Depleted after truck'
+        if timeline.empty or timeline.columns.empty:
+            st.info("No items have been depleted since the first truck was closed.")
+        else:
+            st.write("Items depleted in each window, from a truck's close until the next truck's close:")
+            st.dataframe(timeline)
+
+    # --- Depletion Between Two Trucks ---
+    st.markdown("---")
+    st.subheader("Depletion Between Two Trucks")
+
+    if len(truck_history) >= 2:
+        col1, col2 = st.columns(2)
+        with col1:
+            truck1_pos = st.selectbox("Select First Truck:", truck_history.index, index=len(truck_history)-2, format_func=lambda i: truck_history.at[i, 'label'])
+        with col2:
+            truck2_pos = st.selectbox("Select Second Truck:", truck_history.index, index=len(truck_history)-1, format_func=lambda i: truck_history.at[i, 'label'])
+
+        truck1 = truck_history.iloc[truck1_pos]
+        truck2 = truck_history.iloc[truck2_pos]
+
+        if truck1_pos == truck2_pos:
+            st.warning("Please select two different trucks.")
+        elif truck1_pos > truck2_pos:
+            st.error("The first truck's date must be before the second truck's date.")
+        else:
+            # Windows are consecutive, so the range is a sum of matrix rows - no new query
+            depletion_counts = (
+                matrix.iloc[truck1_pos:truck2_pos].sum()
+                .rename_axis('item_code').reset_index(name='depleted_count')
+            )
+            depletion_counts = depletion_counts[depletion_counts['depleted_count'] > 0].sort_values('depleted_count', ascending=False)
+
+            if not depletion_counts.empty:
+                st.write(f"Items depleted between **{truck1['truck_name']}** and **{truck2['truck_name']}**:")
+                st.dataframe(depletion_counts)
+            else:
+                st.info("No items were depleted between the selected trucks.")
+    elif len(truck_history) == 1:
+        st.info("Please close a second truck in Truck Management to see depletion analysis.")
+    else:
+        st.info("No truck history available yet.")
+
+
+analytics_mode()
@@ -0,0 +1,63 @@
+# modes/notifications.py
+"""Notifications page: admins post the message shown at the top of User, Truck and Admin Mode."""
+import streamlit as st
+
+from core import check_login, mark_data_changed, repo
+
+NOTIFICATION_SECTIONS = ["user", "truck", "admin"]
+
+
+def send_message():
+    section = st.selectbox("Write message to:", NOTIFICATION_SECTIONS)
+    message = st.text_area("Message")
+
+    if st.button("Send / Replace Message"):
+        if not message.strip():
+            st.warning("Please enter a message.")
+            return
+        sender = st.session_state.get("admin_username", "Unknown Admin")
+        # Replaces the section's current message
+        repo.replace_notification(section, message.strip(), sender)
+        mark_data_changed()
+        st.success(f"Message for {section} updated by {sender}!")
+
+
+def manage_messages():
+    st.subheader("Current Messages")
+    messages = repo.list_notifications()
+    if not messages:
+        st.info("No messages posted.")
+
+    for row in messages:
+        st.write(f"**{row['section']}** → {row['message']} (from: {row['sender']})")
+        if st.button(f"Delete {row['section']} ({row['id']})", key=f"delete_message_{row['id']}"):
+            repo.delete_notification(row['id'])
+            mark_data_changed()
+            st.success(f"Deleted message for {row['section']}")
+            st.rerun()
+
+
+def notifications_mode():
+    st.header("Notifications")
+    if not st.session_state.admin_logged_in:
+        username = st.text_input("Admin Username")
+        password = st.text_input("Admin Password", type="password")
+        if st.button("Login as Admin"):
+            is_valid, role = check_login(username, password)
+            if is_valid and role == 'admin':
+                st.session_state.admin_logged_in = True
+                st.session_state.admin_username = username
+            elif is_valid is not None:
+                st.error("Invalid credentials.")
+        return
+
+    st.write(f"Logged in as **{st.session_state.admin_username}**")
+
+    tab1, tab2 = st.tabs(["Send / Replace Message", "Manage Messages"])
+    with tab1:
+        send_message()
+    with tab2:
+        manage_messages()
+
+
+notifications_mode()
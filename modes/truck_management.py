@@ -0,0 +1,255 @@
+# modes/truck_management.py
+"""Truck Management page: create anticipated trucks, follow them and close them."""
+import datetime
+
+import pandas as pd
+import streamlit as st
+
+from analytics import recommend_quantities, TRUCK_DAYS
+from barcodes import create_barcode_pdf, generate_barcode_bytes
+from core import (
+    check_login, get_allowed_items, get_next_slot, get_truck_item_counts, mark_data_changed, repo,
+    show_mirror_freshness, truck_picker,
+)
+
+
+def close_truck(truck_id, closed_by):
+    # One transaction: pending items -> missing, truck -> closed, closure recorded
+    summary = repo.close_truck(truck_id, closed_by, datetime.datetime.now().isoformat())
+    mark_data_changed()
+    return summary
+
+
+RECOMMENDATION_LOOKBACK_DAYS = 365
+
+# Only the newest depletion's result is ever asked for again
+@st.cache_data(show_spinner=False, max_entries=1)
+def get_truck_recommendations(last_depleted_at, today):
+    """Recommended quantity per item and truck day, recomputed only when new depletions arrive."""
+    since = (today - datetime.timedelta(days=RECOMMENDATION_LOOKBACK_DAYS)).isoformat()
+    # Fetch a year of depletions
+    depletions = repo.list_depletions(since)
+    return recommend_quantities(pd.DataFrame(depletions), today=today, lookback_days=RECOMMENDATION_LOOKBACK_DAYS)
+
+
+def management_mode():
+    st.header("Truck Management")
+    if not st.session_state.admin_logged_in:
+        username = st.text_input("Admin Username")
+        password = st.text_input("Admin Password", type="password")
+        if st.button("Login as Admin"):
+            is_valid, role = check_login(username, password)
+            if is_valid and role == 'admin':
+                st.session_state.admin_logged_in = True
+                st.session_state.admin_username = username
+            elif is_valid is not None:
+                st.error("Invalid credentials.")
+        return
+
+    st.write(f"Logged in as **{st.session_state.admin_username}**")
+    if st.button("Logout"):
+        st.session_state.admin_logged_in = False
+        st.session_state.admin_username = ""
+    show_mirror_freshness()
+
+    st.markdown("---")
+
+
+    # ---------- Create Anticipated Truck ----------
+    st.subheader("Create Anticipated Truck")
+
+    # Day-of-week dropdown (outside the form so the quantity grid follows it)
+    selected_day = st.selectbox("Truck Day", TRUCK_DAYS)
+
+    try:
+        recommendations = get_truck_recommendations(repo.latest_depletion_at(), datetime.date.today())
+    except Exception as e:
+        st.warning(f"Could not load recommended quantities: {e}")
+        recommendations = pd.DataFrame(columns=TRUCK_DAYS)
+    if not recommendations.empty:
+        st.caption(f"Quantities are pre-filled with the expected use until the truck after {selected_day}, based on the last year of depletions.")
+
+    with st.form("create_truck_form", clear_on_submit=True):
+        truck_name = st.text_input("Truck Name")
+
+        allowed_items = get_allowed_items()
+
+        # Quantity inputs, pre-filled with the recommendation for the selected day
+        suggested = recommendations[selected_day] if selected_day in recommendations else pd.Series(dtype="int64")
+        qtys = {}
+        for item in allowed_items:
+            qtys[item] = st.number_input(
+                f"{item} quantity", min_value=0, max_value=99, step=1,
+                value=int(suggested.get(item, 0)), key=f"qty_{selected_day}_{item}"
+            )
+
+        # NEW: Number of label slots to skip
+        skip_slots = st.number_input(
+            "Number of label slots to skip (for partially used sticker sheets)", 
+            min_value=0, max_value=29, step=1, value=0
+        )
+
+        submit_button = st.form_submit_button("Generate Anticipated Truck")
+
+    # Handle form submission
+    if submit_button:
+        if not truck_name.strip():
+            st.error("Please enter a name for the truck.")
+        else:
+            try:
+                now = datetime.datetime.now().isoformat()
+
+                # Insert truck and get ID
+                truck_id = repo.create_truck({
+                    'truck_name': truck_name,
+                    'created_by': st.session_state.admin_username,
+                    'created_at': now,
+                    'day_of_week': selected_day
+                })
+
+                barcodes = []
+                items_to_insert = []
+
+                # Slots handed out to this truck so far
+                assigned_slots = {}
+
+                for item, qty in qtys.items():
+                    for _ in range(qty):
+                        slot = get_next_slot(item, assigned_slots)
+                        label = f"{item}_{slot}"
+                        items_to_insert.append({
+                            'truck_id': truck_id,
+                            'item_code': item,
+                            'slot': slot,
+                            'barcode_label': label,
+                            'status': 'pending'
+                        })
+                        png = generate_barcode_bytes(label)
+                        barcodes.append((label, png))
+
+                # Bulk insert anticipated items
+                repo.add_anticipated_items(items_to_insert)
+                mark_data_changed()
+
+                # NEW: Pass skip_slots to barcode PDF generator
+                pdf_data = create_barcode_pdf(barcodes, skip_slots=skip_slots)
+
+                st.download_button(
+                    "Download 10x3 Sticker Sheet (PDF)",
+                    data=pdf_data,
+                    file_name=f"{truck_name}_barcodes.pdf",
+                    mime="application/pdf",
+                    key=f"download_{truck_name}_{datetime.datetime.now().timestamp()}"
+                )
+
+                st.success(f"Anticipated truck '{truck_name}' created for {selected_day}.")
+
+            except Exception as e:
+                st.error(f"Error creating truck: {e}")
+
+
+
+
+    # ---------- Truck Summary Dashboard ----------
+    st.subheader("Truck Summary Dashboard")
+    selected_truck = truck_picker("management", "Select truck to view")
+
+    if selected_truck is not None:
+        t_id = selected_truck['id']
+        truck_name = selected_truck['truck_name']
+
+        counts = pd.DataFrame(get_truck_item_counts(t_id), columns=["item_code", "status", "item_count"])
+
+        status_counts = counts.groupby("status")["item_count"].sum()
+        total_count = int(counts["item_count"].sum())
+        received_count = int(status_counts.get("scanned", 0))
+        missing_count = int(status_counts.get("missing", 0))
+        pending_count = int(status_counts.get("pending", 0))
+        
+        st.markdown(f"""
+        **Summary for Truck ID {t_id}:**
+        - Total Anticipated: **{total_count}**
+        - Received: **{received_count}**
+        - Missing: **{missing_count}**
+        - Pending Scans: **{pending_count}**
+        """)
+
+        breakdown = counts.pivot_table(index="item_code", columns="status", values="item_count", aggfunc="sum", fill_value=0)
+        st.dataframe(breakdown)
+
+        # Actions for selected truck
+        st.markdown("---")
+        st.subheader("Actions for Selected Truck")
+
+        col1, col2, col3 = st.columns(3)
+
+        # Reprint Barcodes button
+        with col1:
+            if st.button("Reprint Barcode Pages"):
+                df_items = pd.DataFrame(repo.list_anticipated_items(t_id))
+                if not df_items.empty:
+                    barcodes_to_reprint = []
+                    for _, row in df_items.iterrows():
+                        png = generate_barcode_bytes(row['barcode_label'])
+                        barcodes_to_reprint.append((row['barcode_label'], png))
+                    
+                    pdf_data = create_barcode_pdf(barcodes_to_reprint)
+                    st.download_button(
+                        label=f"Download Barcodes for {truck_name}",
+                        data=pdf_data,
+                        file_name=f"{truck_name}_reprint.pdf",
+                        mime="application/pdf"
+                    )
+                else:
+                    st.warning("No barcodes to reprint for this truck.")
+
+        # --- Close Truck Button ---
+        with col2:
+            if pending_count > 0:
+                if st.button(f"Close {truck_name} (Mark Pending as Missing)", key=f"close_truck_{t_id}"):
+                    try:
+                        summary = close_truck(t_id, st.session_state.admin_username)
+                        st.success(f"Truck **{truck_name}** closed. {summary['items_missing']} missing items marked.")
+                        st.rerun()
+                    except Exception as e:
+                        st.error(f"Error closing truck: {e}")
+            else:
+                if st.button(f"Close {truck_name}", key=f"force_close_{t_id}"):
+                    try:
+                        close_truck(t_id, st.session_state.admin_username)
+                        st.success(f"Truck **{truck_name}** closed. All items already processed.")
+                        st.rerun()
+                    except Exception as e:
+                        st.error(f"Error closing truck: {e}")
+
+        # --- Delete Truck with Double Verification ---
+        if "confirm_delete_truck" not in st.session_state:
+            st.session_state.confirm_delete_truck = None
+
+        if st.session_state.confirm_delete_truck != t_id:
+            if st.button(f"Delete {truck_name}", key=f"delete_{t_id}"):
+                st.session_state.confirm_delete_truck = t_id
+        else:
+            st.warning(f"Are you sure you want to delete **{truck_name}** and ALL related data?")
+            col1, col2 = st.columns(2)
+
+            with col1:
+                if st.button("Yes, Delete", key=f"yes_delete_{t_id}"):
+                    # Delete the truck and all related data
+                    repo.delete_truck(t_id)
+
+                    st.success(f"Truck **{truck_name}** and all related data were deleted.")
+                    st.session_state.confirm_delete_truck = None
+                    mark_data_changed()
+                    st.rerun()
+
+            with col2:
+                if st.button("Cancel", key=f"cancel_delete_{t_id}"):
+                    st.session_state.confirm_delete_truck = None
+
+
+    else:
+        st.info("No anticipated trucks found. Change the search to see other trucks.")
+
+
+management_mode()
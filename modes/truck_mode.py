@@ -0,0 +1,355 @@
+# modes/truck_mode.py
+"""Truck Mode page: receive a truck's anticipated barcodes and add emergency items."""
+import base64
+import datetime
+import uuid
+
+import streamlit as st
+
+from barcodes import generate_barcode_bytes
+from core import (
+    OFFLINE_SCAN_MESSAGE, check_login, get_allowed_items, get_next_slot, mark_data_changed, recent_requests, repo,
+    scan_request_id, search_reprint_labels, show_notification, show_sync_status, truck_picker, write_queue,
+)
+from repository import is_connection_error
+
+if "pending_add" not in st.session_state:
+    st.session_state.pending_add = None
+if "last_barcode_b64" not in st.session_state:
+    st.session_state.last_barcode_b64 = None
+if "last_barcode_label" not in st.session_state:
+    st.session_state.last_barcode_label = None
+if "last_barcode_bytes" not in st.session_state:
+    st.session_state.last_barcode_bytes = None
+if "batch_scans" not in st.session_state:
+    st.session_state.batch_truck_id = None
+    st.session_state.batch_scans = {}
+    st.session_state.batch_feedback = []
+
+
+def show_last_barcode():
+    if st.session_state.last_barcode_b64:
+        st.subheader("Last Generated Barcode")
+        st.image(st.session_state.last_barcode_bytes, caption=st.session_state.last_barcode_label, width=300)
+        st.download_button(
+            label="Download & Print Barcode",
+            data=st.session_state.last_barcode_bytes,
+            file_name=f"{st.session_state.last_barcode_label}.png",
+            mime="image/png"
+        )
+        st.info("The last generated barcode is saved here until a new one is created. Click 'Download' to save the image to your computer, then print it.")
+
+
+# ----------------- Pending-label index -----------------
+def pending_index(truck_id):
+    """Label -> (anticipated id, item_code, slot) for the truck's pending items.
+
+    Loaded once when a truck is selected and kept current by
+    `record_received`, so scans are validated without a query and only
+    valid ones reach the database. Receives still waiting in the scan
+    journal count as received.
+    """
+    index = st.session_state.get("pending_index")
+    if index is None or index["truck_id"] != truck_id:
+        queued = write_queue.queued_receives(truck_id) if write_queue else set()
+        items = repo.list_pending_items(truck_id)
+        index = st.session_state.pending_index = {
+            "truck_id": truck_id,
+            "pending": {
+                item['barcode_label']: (item['id'], item['item_code'], item['slot'])
+                for item in items if item['id'] not in queued
+            },
+            "received": {item['barcode_label'] for item in items if item['id'] in queued},
+        }
+    return index
+
+def check_scan(index, label):
+    """Returns (level, message) for a label that cannot be received, or None if it is pending.
+
+    A label this session already received is a double scan: reported as
+    info, with nothing written.
+    """
+    if label in index["received"]:
+        return ("info", f"Barcode `{label}` was already received; nothing to do.")
+    if label not in index["pending"]:
+        return ("error", f"Barcode `{label}` not found, not pending, or does not belong to truck {index['truck_id']}.")
+    return None
+
+def receive(truck_id, items):
+    """Receives [(anticipated id, item_code, slot)] off the truck; returns the ids received.
+
+    With the scan journal on, the receive is saved on this station and
+    synced in the background, so every item counts as received at once.
+    Each item's request id is fixed by the session and the item, so a
+    resubmitted receive reports the first outcome instead of writing again.
+    """
+    now = datetime.datetime.now().isoformat()
+    requests = {scan_request_id("receive", item[0]): item for item in items}
+
+    def write(request_ids):
+        batch = [requests[r] for r in request_ids]
+        if write_queue:
+            write_queue.enqueue_receive(truck_id, batch, st.session_state.truck_username, now, request_ids)
+            return request_ids
+        received = set(repo.receive_items(
+            truck_id, [item_id for item_id, _, _ in batch], st.session_state.truck_username, now, request_ids,
+        ))
+        return [r for r in request_ids if requests[r][0] in received]
+
+    return [requests[r][0] for r in recent_requests.deduplicate(list(requests), write)]
+
+def record_received(index, labels):
+    """Moves committed labels out of the pending set, including any the database skipped as no longer pending."""
+    for label in labels:
+        index["pending"].pop(label, None)
+        index["received"].add(label)
+
+
+# ----------------- Batch receive -----------------
+def add_batch_scan(truck_id):
+    scan = st.session_state.batch_scan_input.strip()
+    st.session_state.batch_scan_input = ""
+    if not scan:
+        return
+
+    problem = check_scan(pending_index(truck_id), scan)
+    if scan in st.session_state.batch_scans:
+        st.session_state.batch_feedback = [("info", f"`{scan}` is already in this batch.")]
+    elif problem:
+        st.session_state.batch_feedback = [problem]
+    else:
+        st.session_state.batch_scans[scan] = pending_index(truck_id)["pending"][scan]
+        st.session_state.batch_feedback = [("success", f"Added `{scan}`.")]
+
+def commit_batch(truck_id):
+    scans = st.session_state.batch_scans
+    try:
+        received = receive(truck_id, list(scans.values()))
+    except Exception as e:
+        st.session_state.batch_feedback = [("error", f"Nothing was received; the batch is kept. Details: {e}")]
+        return
+    record_received(pending_index(truck_id), scans)
+    mark_data_changed()
+
+    feedback = [("success", f"Received {len(received)} items for truck {truck_id}.")]
+    skipped = sorted(label for label, (item_id, _, _) in scans.items() if item_id not in set(received))
+    if skipped:
+        feedback.append(("warning", f"No longer pending, skipped: {', '.join(skipped)}"))
+    st.session_state.batch_scans = {}
+    st.session_state.batch_feedback = feedback
+
+def discard_batch():
+    st.session_state.batch_scans = {}
+    st.session_state.batch_feedback = []
+
+@st.fragment
+def batch_receive_panel(truck_id):
+    """Scan many labels, then receive them with one bulk update and one bulk insert.
+
+    Each scan is checked against the pending-label index and added to the
+    batch in the session; nothing is written until the batch is committed.
+    """
+    if st.session_state.batch_truck_id != truck_id:
+        st.session_state.batch_truck_id = truck_id
+        discard_batch()
+    try:
+        pending = pending_index(truck_id)["pending"]
+    except Exception as e:
+        if not is_connection_error(e):
+            raise
+        st.error(OFFLINE_SCAN_MESSAGE)
+        return
+
+    st.text_input("Scan barcodes:", key="batch_scan_input", on_change=add_batch_scan, args=(truck_id,))
+    for kind, text in st.session_state.batch_feedback:
+        getattr(st, kind)(text)
+
+    scans = st.session_state.batch_scans
+    st.write(f"**{len(scans)}** scanned in this batch, **{len(pending) - len(scans)}** still pending on the truck.")
+    tally = {}
+    for _, item_code, _ in scans.values():
+        tally[item_code] = tally.get(item_code, 0) + 1
+    if tally:
+        st.markdown("\n".join(f"- {code}: **{count}**" for code, count in sorted(tally.items())))
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.button(f"Receive {len(scans)} items", type="primary", disabled=not scans,
+                  on_click=commit_batch, args=(truck_id,))
+    with col2:
+        st.button("Discard batch", disabled=not scans, on_click=discard_batch)
+
+
+# ----------------- Emergency add -----------------
+def emergency_request(item_code):
+    """Slot and request id for an Emergency Add of `item_code`, minted once per add.
+
+    They are dropped once the add is answered, so the next submit adds
+    another unit. An add whose answer was lost to a connection error keeps
+    them, so its retry is answered from scan_requests instead of adding a
+    second unit.
+    """
+    request = st.session_state.get("emergency_add")
+    if request is None or request["item_code"] != item_code:
+        # The free slot is looked up on the database itself, never a snapshot
+        request = st.session_state.emergency_add = {
+            "item_code": item_code,
+            "slot": get_next_slot(item_code, {}),
+            "request_id": scan_request_id("emergency", uuid.uuid4().hex),
+        }
+    return request
+
+def emergency_add(request):
+    """Adds the unit of an `emergency_request` through the request dedupe."""
+    now = datetime.datetime.now().isoformat()
+    row = {
+        'item_code': request["item_code"],
+        'slot': request["slot"],
+        'status': 'in_stock',
+        'added_by': st.session_state.truck_username,
+        'added_at': now,
+        'in_stock_at': now
+    }
+
+    def write(request_ids):
+        return request_ids if repo.add_inventory_item(row, request_ids[0]) else []
+
+    recent_requests.deduplicate([request["request_id"]], write)
+
+
+def truck_mode():
+    st.header("Truck Mode")
+    show_notification("truck")
+    show_sync_status()
+
+    # --- 1. Login/Logout Section ---
+    if not st.session_state.get('truck_logged_in', False):
+        username = st.text_input("Username")
+        password = st.text_input("Password", type="password")
+        if st.button("Login"):
+            is_valid, role = check_login(username, password)
+            if is_valid and role in ['truck', 'admin']:
+                st.session_state.truck_logged_in = True
+                st.session_state.truck_username = username
+                st.session_state.truck_role = role
+            elif is_valid is not None:
+                st.error("Invalid credentials.")
+        return
+
+    st.write(f"Logged in as **{st.session_state.truck_username}** ({st.session_state.truck_role})")
+    if st.button("Logout"):
+        st.session_state.truck_logged_in = False
+        st.session_state.truck_username = ""
+    st.markdown("---")
+
+    # --- 2. Truck Selection Section ---
+    st.subheader("Select a Truck to Process")
+    
+    selected_truck = truck_picker("truck_mode", "Select a truck from the list:")
+
+    if selected_truck is not None:
+        t_id = selected_truck['id']
+        st.session_state.current_truck_id = t_id
+        
+        st.success(f"Selected Truck: **{selected_truck['truck_name']} (ID {t_id})**")
+        st.markdown("---")
+    else:
+        st.info("No trucks found. Change the search, or contact an admin to add one.")
+        return
+
+    # --- NEW: Block scanning if truck is closed ---
+    if selected_truck["status"] == "closed":
+        st.warning("This truck has been CLOSED. Scanning and adding items is disabled.")
+        return
+    
+    # --- 3. Scan Anticipated Barcode Section ---
+    st.subheader("Scan Barcode")
+    batch = st.toggle("Batch receive (scan many, commit once)", key="batch_receive")
+    if batch:
+        batch_receive_panel(selected_truck['id'])
+    else:
+        with st.form("scan_form", clear_on_submit=True):
+            scan = st.text_input("Scan or enter barcode:", key="scanner_input")
+            submit_button = st.form_submit_button("Confirm Scan")
+    
+    if not batch and submit_button and scan:
+        # Check the scan against the truck's pending labels; no query for a bad scan
+        try:
+            index = pending_index(t_id)
+        except Exception as e:
+            if not is_connection_error(e):
+                raise
+            index, problem = None, ("error", OFFLINE_SCAN_MESSAGE)
+        else:
+            problem = check_scan(index, scan)
+        
+        if problem is None:
+            try:
+                # Mark the anticipated item scanned and add it to inventory in one call
+                received = receive(t_id, [index["pending"][scan]])
+                record_received(index, [scan])
+                mark_data_changed()
+                if received:
+                    st.success(f"Barcode `{scan}` successfully received for truck {t_id}.")
+                else:
+                    st.error(f"Barcode `{scan}` is no longer pending; it was received on another station.")
+            except Exception as e:
+                st.error(f"Nothing was received; scan it again. Details: {e}")
+        else:
+            level, message = problem
+            getattr(st, level)(message)
+            
+    st.markdown("---")
+
+    # --- 4. Reprint & Emergency Add Sections ---
+    st.subheader("Reprint Existing Barcode")
+    # Nothing is fetched until something is typed
+    search = st.text_input("Search in-stock labels (item name, optionally followed by _slot):", key="reprint_search").strip()
+
+    if search:
+        choices = search_reprint_labels(search)
+        if choices:
+            choice = st.selectbox("Select item to reprint:", choices)
+            if st.button("Reprint"):
+                png = generate_barcode_bytes(choice)
+                st.download_button("Download", png, file_name=f"{choice}.png", mime="image/png")
+        else:
+            st.info(f"No in-stock items match `{search}`.")
+    st.markdown("---")
+
+    st.subheader("Emergency Add Item")
+    allowed = get_allowed_items()
+    
+    if allowed:
+        with st.form("emergency_add_form"):
+            e_item = st.selectbox("Select item:", allowed)
+            if st.form_submit_button("Add Emergency Item"):
+                try:
+                    request = emergency_request(e_item)
+                    label = f"{e_item}_{request['slot']}"
+                    emergency_add(request)
+                    st.session_state.emergency_add = None
+                    st.success(f"Emergency added `{label}` to inventory.")
+
+                    png = generate_barcode_bytes(label)
+                    st.session_state.last_barcode_bytes = png
+                    st.session_state.last_barcode_label = label
+                    st.session_state.last_barcode_b64 = base64.b64encode(png).decode('utf-8')
+                    mark_data_changed()
+                    st.rerun()
+                except Exception as e:
+                    if is_connection_error(e):
+                        st.error("Offline: Emergency Add needs the database to pick a free slot and save the unit. "
+                                 "Add the item again when the connection returns.")
+                    else:
+                        # Refused, not lost: the next try picks a fresh slot
+                        st.session_state.emergency_add = None
+                        st.error(f"Error adding item. This item-slot combination might already exist. Details: {e}")
+        
+        if st.session_state.get('last_barcode_b64'):
+            show_last_barcode()
+    else:
+        st.warning("No allowed items are configured. Please contact an admin.")
+
+
+truck_mode()
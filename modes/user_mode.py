@@ -0,0 +1,353 @@
+# modes/user_mode.py
+"""User Mode page: scan a unit and move it along in_stock -> in_use -> depleted."""
+import datetime
+import uuid
+
+import streamlit as st
+
+from core import (
+    OFFLINE_SCAN_MESSAGE, mark_data_changed, recent_requests, repo, scan_request_id, show_notification,
+    show_sync_status, write_queue,
+)
+from repository import STATUS_TRANSITIONS, is_connection_error
+
+
+def scan_message(kind, text):
+    """Queues feedback for the scan panel; callbacks cannot draw inside a fragment."""
+    st.session_state.scan_feedback.append((kind, text))
+
+def show_scan_feedback():
+    for kind, text in st.session_state.scan_feedback:
+        if kind == "error":
+            st.error(text)
+        elif kind == "success":
+            st.success(text)
+        else:
+            st.markdown(text, unsafe_allow_html=True)
+
+def handle_user_scan_auto():
+    scanned_code = st.session_state.user_scan_input.strip()
+    # Empty the box right away so the next keyboard-wedge scan starts clean
+    st.session_state.user_scan_input = ""
+
+    st.session_state.scan_feedback = []
+    st.session_state.user_mode_scan_data = None
+    st.session_state.manual_update_visible = False
+    st.session_state.update_success = None
+    st.session_state.last_processed_scan = scanned_code
+
+    if not scanned_code:
+        scan_message("error", "Please scan or enter a barcode.")
+        return
+
+    try:
+        parts = scanned_code.rsplit("_", 1)
+        if len(parts) != 2:
+            scan_message("error", "Invalid format. Use `itemcode_slot` (e.g., `CFA_SAUCE_1`).")
+            return
+        item_code, slot_s = parts
+        slot = int(slot_s)
+
+        # Check if item is in allowed_items
+        if not repo.is_allowed_item(item_code):
+            scan_message("error", "NOT REGISTERED: This item code is not in the allowed list.")
+            return
+
+        # Check if item is in inventory; a change still in the write queue wins over the backend
+        current_status = (write_queue and write_queue.pending_status(item_code, slot)) or repo.get_item_status(item_code, slot)
+        if current_status is None:
+            scan_message("error", "Item not found in inventory. Please check the barcode or add it first.")
+            return
+
+        st.session_state.user_mode_scan_data = {
+            "item_code": item_code,
+            "slot": slot,
+            "current_status": current_status,
+            # One write per scan, however often its button fires
+            "request_id": scan_request_id(uuid.uuid4().hex),
+        }
+        scan_message("success", f"Scanned: **{item_code}**, Slot **{slot}**. Current Status: **{current_status}**")
+
+        # FIFO hint logic
+        if current_status == 'in_stock':
+            oldest_slot = repo.oldest_in_stock_slot(item_code)
+            if oldest_slot is not None:
+                if oldest_slot == slot:
+                    scan_message("html", '<div style="background-color:#28a745;color:white;padding:10px;border-radius:5px;text-align:center;">FIFO HINT: USE THIS ITEM FIRST</div>')
+                else:
+                    scan_message("html", f'<div style="background-color:#dc3545;color:white;padding:10px;border-radius:5px;text-align:center;">FIFO HINT: **{item_code}_{oldest_slot}** is first</div>')
+    except (ValueError, IndexError):
+        scan_message("error", "Invalid format. Use `itemcode_slot` (e.g., `CFA_SAUCE_1`).")
+    except Exception as e:
+        if not is_connection_error(e):
+            raise
+        st.session_state.user_mode_scan_data = None
+        st.session_state.scan_feedback = [("error", OFFLINE_SCAN_MESSAGE)]
+
+
+# ----------------- Bulk update -----------------
+# Bulk actions and the status a unit must be in for each: the usual source in the state machine
+BULK_ACTIONS = {"Mark as In Use": "in_use", "Confirm Depletion": "depleted", "Mark as In Stock": "in_stock"}
+BULK_EXPECTED_STATUS = {status: sources[0] for status, sources in STATUS_TRANSITIONS.items()}
+
+def add_bulk_scan():
+    label = st.session_state.bulk_scan_input.strip()
+    st.session_state.bulk_scan_input = ""
+    st.session_state.scan_feedback = []
+    if not label:
+        return
+
+    parts = label.rsplit("_", 1)
+    if len(parts) != 2 or not parts[1].isdigit():
+        scan_message("error", "Invalid format. Use `itemcode_slot` (e.g., `CFA_SAUCE_1`).")
+    elif label in st.session_state.bulk_scans:
+        scan_message("error", f"`{label}` is already in the list.")
+    else:
+        # Each unit keeps the time it was scanned and its own request id
+        st.session_state.bulk_scans[label] = (parts[0], int(parts[1]), datetime.datetime.now().isoformat(), scan_request_id(uuid.uuid4().hex))
+
+def apply_bulk_update(new_status):
+    scans = st.session_state.bulk_scans
+    expected = BULK_EXPECTED_STATUS[new_status]
+    units = {request_id: (item_code, slot, changed_at) for item_code, slot, changed_at, request_id in scans.values()}
+
+    def write(request_ids):
+        if write_queue:
+            # Journaled like single scans, so they replay in order behind any queued for the same units
+            write_queue.enqueue_statuses([units[r] for r in request_ids], new_status, expected, request_ids)
+            return request_ids
+        updated = set(repo.update_inventory_statuses([units[r] for r in request_ids], new_status, expected, request_ids))
+        return [r for r in request_ids if units[r][:2] in updated]
+
+    try:
+        updated = recent_requests.deduplicate(list(units), write)
+    except Exception as e:
+        st.session_state.scan_feedback = [("error", f"Nothing was updated; the list is kept. Details: {e}")]
+        return
+    mark_data_changed()
+
+    st.session_state.scan_feedback = []
+    if updated:
+        scan_message("success", f"Updated {len(updated)} items to **{new_status}**.")
+    failed = [label for label, (_, _, _, request_id) in scans.items() if request_id not in updated]
+    if failed:
+        scan_message("error", f"Not updated, not {expected} or not in inventory: {', '.join(failed)}")
+    st.session_state.bulk_scans = {}
+
+def bulk_update_panel():
+    """Collects several labels and moves them all to one status with a single bulk update."""
+    action = st.radio("Action", list(BULK_ACTIONS), horizontal=True, key="bulk_action")
+    new_status = BULK_ACTIONS[action]
+
+    st.text_input("Scan barcodes (format: itemcode_slot)", key="bulk_scan_input", on_change=add_bulk_scan)
+    show_scan_feedback()
+
+    scans = st.session_state.bulk_scans
+    if scans:
+        st.markdown("\n".join(f"- `{label}`" for label in scans))
+    col1, col2 = st.columns(2)
+    with col1:
+        st.button(f"{action}: {len(scans)} items", type="primary", disabled=not scans,
+                  on_click=apply_bulk_update, args=(new_status,))
+    with col2:
+        st.button("Clear list", disabled=not scans, on_click=lambda: st.session_state.update(bulk_scans={}, scan_feedback=[]))
+
+
+# ----------------- User Mode -----------------
+def user_mode():
+    st.header("User Mode - Update Item Status")
+    show_notification("user")
+
+    # --- Initialize session state ---
+    if "update_success" not in st.session_state:
+        st.session_state.update_success = None
+    if "user_mode_scan_data" not in st.session_state:
+        st.session_state.user_mode_scan_data = None
+    if "manual_update_visible" not in st.session_state:
+        st.session_state.manual_update_visible = False
+    if "manual_update_done" not in st.session_state:
+        st.session_state.manual_update_done = False
+    if "manual_status_radio" not in st.session_state:
+        st.session_state.manual_status_radio = "in_stock"  # default
+    if "user_scan_input" not in st.session_state:  
+        st.session_state.user_scan_input = ""
+    if "scan_feedback" not in st.session_state:
+        st.session_state.scan_feedback = []
+    if "bulk_scans" not in st.session_state:
+        st.session_state.bulk_scans = {}
+
+    scan_panel()
+
+@st.fragment
+def scan_panel():
+    """The scan box and result panel; a scan or button click reruns only this fragment."""
+    # --- Show last update success message ---
+    if st.session_state.update_success:
+        st.success(st.session_state.update_success)
+        st.session_state.update_success = None
+
+    show_sync_status()
+
+    if st.toggle("Bulk update (scan several, apply once)", key="bulk_mode", on_change=reset_user_scan_state):
+        bulk_update_panel()
+        return
+
+    # --- Scan input and clear button ---
+    # Show the scan input (state-managed); the box is emptied after every scan
+    st.text_input(
+        "Scan or enter barcode (format: itemcode_slot)",
+        key="user_scan_input",
+        on_change=handle_user_scan_auto
+    )
+
+    # "Clear Box" button BELOW the input
+    st.button("Clear Box", on_click=clear_scan_box)
+
+    show_scan_feedback()
+
+    scan_data = st.session_state.user_mode_scan_data
+    if not scan_data:
+        return
+
+
+    item_code = scan_data['item_code']
+    slot = scan_data['slot']
+    current_status = scan_data['current_status']
+    request_id = scan_data['request_id']
+
+    st.info(f"Current status of **{item_code}_{slot}**: **{current_status}**")
+
+    # --- Status update buttons ---
+    if current_status == 'in_stock':
+        st.button(
+            "Mark as In Use",
+            key=f"mark_in_use_{item_code}_{slot}",
+            on_click=process_scan_and_update,
+            args=('in_use', item_code, slot, current_status, request_id)
+        )
+    elif current_status == 'in_use':
+        st.warning(f"Next step: mark **{item_code}_{slot}** as depleted")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.button(
+                "Confirm Depletion",
+                key=f"confirm_depletion_{item_code}_{slot}",
+                on_click=process_scan_and_update,
+                args=('depleted', item_code, slot, current_status, request_id)
+            )
+        with col2:
+            st.button(
+                "Cancel",
+                key=f"cancel_in_use_{item_code}_{slot}",
+                on_click=reset_user_scan_state
+            )
+        with col3:
+            st.button(
+                "Other Options",
+                key=f"manual_override_{item_code}_{slot}",
+                on_click=lambda: st.session_state.update({'manual_update_visible': True})
+            )
+    elif current_status == 'depleted':
+        st.info("This item is already depleted.")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.button(
+                "Mark as In Stock",
+                key=f"mark_in_stock_{item_code}_{slot}",
+                on_click=process_scan_and_update,
+                args=('in_stock', item_code, slot, current_status, request_id)
+            )
+        with col2:
+            st.button(
+                "Cancel",
+                key=f"cancel_depleted_{item_code}_{slot}",
+                on_click=reset_user_scan_state
+            )
+
+    # --- Manual override ---
+    if st.session_state.manual_update_visible:
+        st.markdown("---")
+        st.subheader("Manual Status Update")
+        # Only the moves the state machine allows from the current status
+        status_options = [status for status, sources in STATUS_TRANSITIONS.items() if current_status in sources]
+        new_status_manual = st.radio(
+            "Select new status:",
+            status_options,
+            key=f"manual_status_radio_{item_code}_{slot}"
+        )
+
+        def confirm_manual_update():
+            st.session_state.manual_update_done = process_scan_and_update(new_status_manual, item_code, slot, current_status, request_id)
+            st.session_state.manual_status_radio = new_status_manual
+            st.session_state.manual_update_visible = False
+
+        def cancel_manual_update():
+            st.session_state.manual_update_visible = False
+            st.session_state.manual_status_radio = current_status
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.button(
+                "Confirm Manual Update",
+                key=f"confirm_manual_{item_code}_{slot}",
+                on_click=confirm_manual_update
+            )
+        with col2:
+            st.button(
+                "Cancel",
+                key=f"cancel_manual_{item_code}_{slot}",
+                on_click=cancel_manual_update
+            )
+
+    # --- Show success message for manual override ---
+    if st.session_state.manual_update_done:
+        st.success(f"Status updated to **{st.session_state.manual_status_radio}**!")
+        st.session_state.manual_update_done = False
+
+# ----------------- User Mode Helpers -----------------
+# The function below needs to be defined BEFORE it is called.
+# It was in your previous prompt but it is important to include here too.
+def process_scan_and_update(new_status, item_code, slot, expected_status, request_id):
+    """Moves the unit from the status shown at scan time; returns whether it moved.
+
+    `request_id` makes it idempotent: a repeat of the same scan's write
+    reports the first outcome without writing again.
+    """
+    now = datetime.datetime.now().isoformat()
+
+    def write(request_ids):
+        if write_queue:
+            # Journaled locally and acknowledged now; the queue applies it as the same compare-and-set
+            write_queue.enqueue(item_code, slot, new_status, expected_status, now, client_id=request_id)
+            return request_ids
+        # Compare-and-set: applies only if no other station changed the unit since the scan
+        return request_ids if repo.transition_inventory_item(item_code, slot, new_status, expected_status, now, request_id) else []
+
+    try:
+        applied = bool(recent_requests.deduplicate([request_id], write))
+    except Exception as e:
+        if not is_connection_error(e):
+            raise
+        # The scan stays up, so confirming again retries under the same request id
+        st.session_state.scan_feedback = [("error", OFFLINE_SCAN_MESSAGE)]
+        return False
+    mark_data_changed()
+
+    reset_user_scan_state()
+    if applied:
+        st.session_state.update_success = f"Item `{item_code}_{slot}` updated to **{new_status}**."
+    else:
+        scan_message("error", f"`{item_code}_{slot}` is no longer **{expected_status}**; it was changed on another station. Scan it again.")
+    return applied
+
+def reset_user_scan_state():
+    st.session_state.user_mode_scan_data = None
+    st.session_state.manual_update_visible = False
+    st.session_state.scan_feedback = []
+
+def clear_scan_box():
+    st.session_state.user_scan_input = ""
+    reset_user_scan_state()
+
+
+user_mode()
@@ -0,0 +1,1078 @@
+# repository.py
+import abc
+import contextlib
+import datetime
+import sys
+import time
+
+from local_db import ConnectionPool, get_connection, setup_database
+from sync import fetch_all_rows
+
+
+class Repository(abc.ABC):
+    """Storage interface used by every mode.
+
+    One implementation per backend: `SupabaseRepository` for the hosted
+    database, `SQLiteRepository` for a store running fully offline, and
+    `MirroredRepository` which reads from a local mirror and writes to
+    Supabase. Rows are plain dicts keyed by column name.
+    """
+
+    # --- Allowed items ---
+    @abc.abstractmethod
+    def list_allowed_items(self):
+        ...
+
+    @abc.abstractmethod
+    def is_allowed_item(self, item_name):
+        ...
+
+    @abc.abstractmethod
+    def add_allowed_item(self, item_name):
+        ...
+
+    @abc.abstractmethod
+    def delete_allowed_items(self, item_names):
+        ...
+
+    # --- Users ---
+    @abc.abstractmethod
+    def get_user(self, username):
+        """Returns {'password', 'role'} for the user, or None."""
+
+    @abc.abstractmethod
+    def list_users(self):
+        ...
+
+    @abc.abstractmethod
+    def add_user(self, username, password, role):
+        ...
+
+    @abc.abstractmethod
+    def delete_user(self, username):
+        ...
+
+    # --- Inventory ---
+    @abc.abstractmethod
+    def get_item_status(self, item_code, slot):
+        """Returns the status of one inventory unit, or None if it does not exist."""
+
+    @abc.abstractmethod
+    def oldest_in_stock_slot(self, item_code):
+        """Slot of the first-in in_stock unit of an item (FIFO), or None."""
+
+    @abc.abstractmethod
+    def list_item_slots(self, item_code):
+        ...
+
+    @abc.abstractmethod
+    def list_inventory(self):
+        ...
+
+    @abc.abstractmethod
+    def search_in_stock_labels(self, text, limit=20):
+        """Labels (ITEM_SLOT) of in-stock units matching what was typed, sorted.
+
+        "cfa" matches items starting with it; "CFA SAUCE_1" matches that
+        item's slots starting with 1. Item names ignore case.
+        """
+
+    @abc.abstractmethod
+    def add_inventory_item(self, row, request_id=None):
+        """Inserts one inventory unit; returns whether it was added.
+
+        `request_id` is an idempotency key recorded in scan_requests, as for
+        scans: a repeat of an add already made inserts nothing and returns
+        the first outcome.
+        """
+
+    @abc.abstractmethod
+    def update_inventory_item(self, item_code, slot, fields):
+        ...
+
+    @abc.abstractmethod
+    def update_inventory_statuses(self, units, new_status, expected_status, request_ids=None):
+        """Moves many units from `expected_status` to `new_status` in one bulk update.
+
+        `units` is [(item_code, slot, changed_at)]; each unit gets its own
+        `changed_at` in the new status's timestamp column. Units not in
+        `expected_status`, or not in inventory, are left alone. Returns the
+        (item_code, slot) pairs that were updated.
+
+        `request_ids`, one per unit, are idempotency keys recorded in
+        scan_requests: a unit whose request id was seen before is not
+        updated again and is returned only if that first request updated it.
+
+        Raises ValueError if the state machine does not allow the move.
+        """
+
+    def transition_inventory_item(self, item_code, slot, new_status, expected_status, changed_at, request_id=None):
+        """Compare-and-set on one unit: moves it only if it is still in `expected_status`.
+
+        Returns whether it moved, so a stale read on another station can
+        never overwrite a newer status.
+        """
+        request_ids = [request_id] if request_id else None
+        return bool(self.update_inventory_statuses([(item_code, slot, changed_at)], new_status, expected_status, request_ids))
+
+    @abc.abstractmethod
+    def clear_inventory(self):
+        ...
+
+    @abc.abstractmethod
+    def archive_depleted(self, cutoff, batch_size):
+        """Moves up to `batch_size` units depleted before `cutoff` into inventory_history; returns how many moved."""
+
+    @abc.abstractmethod
+    def list_depletions(self, since=None):
+        """Depleted units (item_code, in_use_at, depleted_at), live and archived, optionally only those depleted since `since`."""
+
+    @abc.abstractmethod
+    def latest_depletion_at(self):
+        ...
+
+    @abc.abstractmethod
+    def list_truck_receivers(self, truck_id):
+        """Users who received still in-stock units from a truck."""
+
+    # --- Trucks ---
+    @abc.abstractmethod
+    def search_trucks(self, closed=None, created_from=None, created_before=None, name_prefix=None, limit=20, offset=0):
+        """One page of trucks, newest first.
+
+        `closed` picks only closed (True) or only open (False) trucks; the
+        dates bound `created_at` (ISO strings, end exclusive) and
+        `name_prefix` matches the start of the name, ignoring case.
+        """
+
+    @abc.abstractmethod
+    def get_truck_names(self, truck_ids):
+        """{truck id: name} for the given ids; deleted trucks are left out."""
+
+    @abc.abstractmethod
+    def create_truck(self, row):
+        """Inserts a truck and returns its id."""
+
+    @abc.abstractmethod
+    def close_truck(self, truck_id, closed_by, closed_at):
+        """Closes a truck in one transaction and returns its summary.
+
+        Pending items are marked missing, the truck is marked closed and an
+        analytics_history row is written with counts computed by the
+        database. Returns {'items_processed', 'items_missing', 'total_items',
+        'closed_at'}; raises if the truck does not exist or is already closed.
+        """
+
+    @abc.abstractmethod
+    def delete_truck(self, truck_id):
+        """Deletes a truck and all of its related data."""
+
+    # --- Anticipated items ---
+    @abc.abstractmethod
+    def list_anticipated_items(self, truck_id):
+        ...
+
+    @abc.abstractmethod
+    def list_anticipated_slots(self, item_code):
+        ...
+
+    @abc.abstractmethod
+    def list_pending_items(self, truck_id):
+        """{'id', 'item_code', 'slot', 'barcode_label'} for every pending item on the truck."""
+
+    @abc.abstractmethod
+    def receive_items(self, truck_id, item_ids, received_by, received_at, request_ids=None):
+        """Receives a batch of the truck's anticipated items in one transaction.
+
+        One bulk update marks the items that are still pending as scanned and
+        one bulk insert adds them to inventory as in stock. Returns the ids
+        received; ids no longer pending are skipped. `request_ids`, one per
+        item, make the receive idempotent as in `update_inventory_statuses`.
+        """
+
+    @abc.abstractmethod
+    def prune_scan_requests(self, cutoff):
+        """Forgets the idempotency keys recorded before `cutoff`; returns how many were deleted."""
+
+    @abc.abstractmethod
+    def add_anticipated_items(self, rows):
+        ...
+
+    @abc.abstractmethod
+    def count_truck_items(self, truck_id):
+        """(item_code, status, item_count) rows for one truck, aggregated by the database."""
+
+    @abc.abstractmethod
+    def compact_closed_trucks(self, prune=False):
+        """Summarises closed trucks into anticipated_item_counts; returns how many were compacted.
+
+        With `prune`, the per-unit anticipated_items rows of compacted trucks are deleted.
+        """
+
+    # --- Analytics history ---
+    @abc.abstractmethod
+    def list_truck_closures(self):
+        """All closures (truck_id, closed_at), oldest first."""
+
+    @abc.abstractmethod
+    def get_truck_closure(self, truck_id):
+        ...
+
+    # --- Notifications ---
+    @abc.abstractmethod
+    def get_notification(self, section):
+        """The latest {'message', 'sender'} posted to a section, or None."""
+
+    @abc.abstractmethod
+    def list_notifications(self):
+        """Every notification, newest first."""
+
+    @abc.abstractmethod
+    def replace_notification(self, section, message, sender):
+        """Deletes the section's current message and posts this one."""
+
+    @abc.abstractmethod
+    def delete_notification(self, notification_id):
+        ...
+
+    # --- Cache validation ---
+    def data_versions(self):
+        """Per-table version counters; a counter moves whenever its table is written."""
+
+
+INVENTORY_COLUMNS = "item_code, slot, status, in_stock_at, in_use_at, depleted_at, added_at"
+# Lifecycle status -> the inventory column stamped when a unit enters it
+STATUS_TIMESTAMPS = {"in_stock": "in_stock_at", "in_use": "in_use_at", "depleted": "depleted_at"}
+# The unit state machine: new status -> the statuses it may be entered from,
+# the usual one first. in_stock -> in_use -> depleted, a depleted slot is
+# restocked, and an opened unit can be put back
+STATUS_TRANSITIONS = {"in_use": ("in_stock",), "depleted": ("in_use",), "in_stock": ("depleted", "in_use")}
+
+
+def check_transition(new_status, expected_status):
+    if expected_status not in STATUS_TRANSITIONS.get(new_status, ()):
+        raise ValueError(f"A unit cannot go from {expected_status} to {new_status}")
+
+
+def is_connection_error(e):
+    """Whether `e` means the backend could not be reached, as opposed to it refusing the request."""
+    if isinstance(e, OSError):
+        return True
+    # The Supabase client's transport; only loaded when that backend is in use
+    httpx = sys.modules.get("httpx")
+    return httpx is not None and isinstance(e, httpx.TransportError)
+
+
+TRUCK_COLUMNS = "id, truck_name, created_by, created_at, status, day_of_week, compacted_at"
+ARCHIVED_COLUMNS = "id, item_code, slot, status, added_by, added_at, in_stock_at, in_use_at, depleted_at, truck_id"
+
+
+def split_label_query(text):
+    """Splits a typed label into (item, slot prefix); the slot prefix is None while no "_DIGITS" part is typed."""
+    item, separator, slot = text.rpartition("_")
+    if separator and (slot == "" or slot.isdigit()):
+        return item, slot
+    return text, None
+
+
+def escape_like(text):
+    """Escapes LIKE wildcards so user input only matches literally."""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class SupabaseRepository(Repository):
+    def __init__(self, client):
+        self.client = client
+
+    def table(self, name):
+        return self.client.from_(name)
+
+    # --- Allowed items ---
+    def list_allowed_items(self):
+        return [item["item_name"] for item in self.table("allowed_items").select("item_name").order("item_name").execute().data]
+
+    def is_allowed_item(self, item_name):
+        return bool(self.table("allowed_items").select("item_name").eq("item_name", item_name).execute().data)
+
+    def add_allowed_item(self, item_name):
+        self.table("allowed_items").insert({"item_name": item_name}).execute()
+
+    def delete_allowed_items(self, item_names):
+        self.table("allowed_items").delete().in_("item_name", item_names).execute()
+
+    # --- Users ---
+    def get_user(self, username):
+        users = self.table("users").select("password, role").eq("username", username).execute().data
+        return users[0] if users else None
+
+    def list_users(self):
+        return self.table("users").select("username, role").order("username").execute().data
+
+    def add_user(self, username, password, role):
+        self.table("users").insert({"username": username, "password": password, "role": role}).execute()
+
+    def delete_user(self, username):
+        self.table("users").delete().eq("username", username).execute()
+
+    # --- Inventory ---
+    def get_item_status(self, item_code, slot):
+        items = self.table("inventory").select("status").eq("item_code", item_code).eq("slot", slot).execute().data
+        return items[0]["status"] if items else None
+
+    def oldest_in_stock_slot(self, item_code):
+        oldest = self.table("inventory").select("slot").eq("item_code", item_code).eq("status", "in_stock").order("added_at").limit(1).execute().data
+        return oldest[0]["slot"] if oldest else None
+
+    def list_item_slots(self, item_code):
+        return self.table("inventory").select("slot, status").eq("item_code", item_code).execute().data
+
+    def list_inventory(self):
+        return fetch_all_rows(lambda: self.table("inventory").select(INVENTORY_COLUMNS).order("item_code").order("slot"))
+
+    def search_in_stock_labels(self, text, limit=20):
+        item, slot_prefix = split_label_query(text)
+        query = self.table("inventory").select("item_code, slot").eq("status", "in_stock")
+        if slot_prefix is None:
+            rows = query.ilike("item_code", f"{escape_like(item)}%").order("item_code").order("slot").limit(limit).execute().data
+        else:
+            # One item has at most 99 slots; the slot prefix is matched here
+            rows = query.ilike("item_code", escape_like(item)).order("slot").execute().data
+            rows = [row for row in rows if str(row["slot"]).startswith(slot_prefix)][:limit]
+        return [f"{row['item_code']}_{row['slot']}" for row in rows]
+
+    def add_inventory_item(self, row, request_id=None):
+        if request_id is None:
+            self.table("inventory").insert(row).execute()
+            return True
+        return self.client.rpc("add_inventory_item", {"p_row": row, "p_request_id": request_id}).execute().data
+
+    def update_inventory_item(self, item_code, slot, fields):
+        self.table("inventory").update(fields).eq("item_code", item_code).eq("slot", slot).execute()
+
+    def update_inventory_statuses(self, units, new_status, expected_status, request_ids=None):
+        check_transition(new_status, expected_status)
+        request_ids = request_ids or [None] * len(units)
+        rows = self.client.rpc("update_inventory_statuses", {
+            "p_units": [
+                {"item_code": code, "slot": slot, "changed_at": at, "request_id": request_id}
+                for (code, slot, at), request_id in zip(units, request_ids)
+            ],
+            "p_status": new_status,
+            "p_expected": expected_status,
+        }).execute().data
+        return [(row["item_code"], row["slot"]) for row in rows or []]
+
+    def clear_inventory(self):
+        # Deletes need a filter; every id matches this one
+        self.table("inventory").delete().gte("id", 0).execute()
+
+    def archive_depleted(self, cutoff, batch_size):
+        return self.client.rpc("archive_depleted_inventory", {"cutoff": cutoff, "batch_size": batch_size}).execute().data
+
+    def list_depletions(self, since=None):
+        def query(table):
+            q = self.table(table).select("item_code, in_use_at, depleted_at").not_.is_("depleted_at", None)
+            if since is not None:
+                q = q.gte("depleted_at", since)
+            return q.order("id")
+        return fetch_all_rows(lambda: query("inventory")) + fetch_all_rows(lambda: query("inventory_history"))
+
+    def latest_depletion_at(self):
+        newest = [
+            row["depleted_at"]
+            for table in ("inventory", "inventory_history")
+            for row in self.table(table).select("depleted_at").not_.is_("depleted_at", None).order("depleted_at", desc=True).limit(1).execute().data
+        ]
+        return max(newest, default=None)
+
+    def list_truck_receivers(self, truck_id):
+        rows = self.table("inventory").select("added_by").eq("truck_id", truck_id).eq("status", "in_stock").execute().data
+        return sorted({row["added_by"] for row in rows})
+
+    # --- Trucks ---
+    def search_trucks(self, closed=None, created_from=None, created_before=None, name_prefix=None, limit=20, offset=0):
+        query = self.table("anticipated_trucks").select(TRUCK_COLUMNS)
+        if closed is True:
+            query = query.eq("status", "closed")
+        elif closed is False:
+            query = query.neq("status", "closed")
+        if created_from:
+            query = query.gte("created_at", created_from)
+        if created_before:
+            query = query.lt("created_at", created_before)
+        if name_prefix:
+            query = query.ilike("truck_name", f"{escape_like(name_prefix)}%")
+        return query.order("created_at", desc=True).range(offset, offset + limit - 1).execute().data
+
+    def get_truck_names(self, truck_ids):
+        if not truck_ids:
+            return {}
+        rows = self.table("anticipated_trucks").select("id, truck_name").in_("id", list(truck_ids)).execute().data
+        return {row["id"]: row["truck_name"] for row in rows}
+
+    def create_truck(self, row):
+        return self.table("anticipated_trucks").insert(row).execute().data[0]["id"]
+
+    def close_truck(self, truck_id, closed_by, closed_at):
+        return self.client.rpc("close_truck", {"p_truck_id": truck_id, "p_closed_by": closed_by, "p_closed_at": closed_at}).execute().data
+
+    def delete_truck(self, truck_id):
+        # Delete all related data in proper order
+        self.table("analytics_history").delete().eq("truck_id", truck_id).execute()
+        self.table("inventory").delete().eq("truck_id", truck_id).execute()
+        self.table("inventory_history").delete().eq("truck_id", truck_id).execute()
+        self.table("anticipated_items").delete().eq("truck_id", truck_id).execute()
+        self.table("anticipated_item_counts").delete().eq("truck_id", truck_id).execute()
+        self.table("anticipated_trucks").delete().eq("id", truck_id).execute()
+
+    # --- Anticipated items ---
+    def list_anticipated_items(self, truck_id):
+        return self.table("anticipated_items").select("*").eq("truck_id", truck_id).execute().data
+
+    def list_anticipated_slots(self, item_code):
+        return [row["slot"] for row in self.table("anticipated_items").select("slot").eq("item_code", item_code).execute().data]
+
+    def list_pending_items(self, truck_id):
+        return self.table("anticipated_items").select("id, item_code, slot, barcode_label").eq("truck_id", truck_id).eq("status", "pending").execute().data
+
+    def receive_items(self, truck_id, item_ids, received_by, received_at, request_ids=None):
+        return self.client.rpc("receive_truck_items", {
+            "p_truck_id": truck_id, "p_item_ids": list(item_ids), "p_received_by": received_by, "p_received_at": received_at,
+            "p_request_ids": list(request_ids) if request_ids else None,
+        }).execute().data
+
+    def prune_scan_requests(self, cutoff):
+        return len(self.table("scan_requests").delete().lt("created_at", cutoff).execute().data)
+
+    def add_anticipated_items(self, rows):
+        self.table("anticipated_items").insert(rows).execute()
+
+    def count_truck_items(self, truck_id):
+        return self.table("truck_item_status_counts").select("item_code, status, item_count").eq("truck_id", truck_id).execute().data
+
+    def compact_closed_trucks(self, prune=False):
+        return self.client.rpc("compact_closed_trucks", {"prune": prune}).execute().data
+
+    # --- Analytics history ---
+    def list_truck_closures(self):
+        return self.table("analytics_history").select("truck_id, closed_at").order("closed_at").execute().data
+
+    def get_truck_closure(self, truck_id):
+        closures = self.table("analytics_history").select("closed_by, closed_at").eq("truck_id", truck_id).execute().data
+        return closures[0] if closures else None
+
+    # --- Notifications ---
+    def get_notification(self, section):
+        rows = self.table("notifications").select("message, sender").eq("section", section).order("created_at", desc=True).limit(1).execute().data
+        return rows[0] if rows else None
+
+    def list_notifications(self):
+        return self.table("notifications").select("id, section, message, sender, created_at").order("created_at", desc=True).execute().data
+
+    def replace_notification(self, section, message, sender):
+        self.table("notifications").delete().eq("section", section).execute()
+        self.table("notifications").insert({"section": section, "message": message, "sender": sender}).execute()
+
+    def delete_notification(self, notification_id):
+        self.table("notifications").delete().eq("id", notification_id).execute()
+
+    # --- Cache validation ---
+    def data_versions(self):
+        rows = self.table("data_versions").select("table_name, version").execute().data
+        return {row["table_name"]: row["version"] for row in rows}
+
+
+class SQLiteRepository(Repository):
+    """Embedded backend on a local SQLite file, for offline stores and the read mirror."""
+
+    def __init__(self, db_name, tuned=True):
+        self.db_name = db_name
+        # Untuned: default pragmas and a fresh connection per call, as before
+        # the pool existed; kept so benchmark.py can measure the difference
+        self.pool = ConnectionPool(db_name) if tuned else None
+        setup_database(db_name, tuned=tuned)
+
+    @contextlib.contextmanager
+    def connection(self):
+        if self.pool is not None:
+            with self.pool.connection() as conn:
+                yield conn
+            return
+        conn = get_connection(self.db_name, tuned=False)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def fetch(self, sql, params=()):
+        with self.connection() as conn:
+            return [dict(row) for row in conn.execute(sql, params)]
+
+    def fetch_one(self, sql, params=()):
+        rows = self.fetch(sql, params)
+        return rows[0] if rows else None
+
+    def execute(self, sql, params=()):
+        with self.connection() as conn, conn:
+            return conn.execute(sql, params)
+
+    def insert(self, table, row):
+        columns = ", ".join(row)
+        placeholders = ", ".join("?" * len(row))
+        return self.execute(f"INSERT INTO {table} ({columns}) VALUES ({placeholders})", tuple(row.values())).lastrowid
+
+    # --- Allowed items ---
+    def list_allowed_items(self):
+        return [row["item_name"] for row in self.fetch("SELECT item_name FROM allowed_items ORDER BY item_name")]
+
+    def is_allowed_item(self, item_name):
+        return self.fetch_one("SELECT 1 FROM allowed_items WHERE item_name = ?", (item_name,)) is not None
+
+    def add_allowed_item(self, item_name):
+        self.insert("allowed_items", {"item_name": item_name})
+
+    def delete_allowed_items(self, item_names):
+        placeholders = ", ".join("?" * len(item_names))
+        self.execute(f"DELETE FROM allowed_items WHERE item_name IN ({placeholders})", tuple(item_names))
+
+    # --- Users ---
+    def get_user(self, username):
+        return self.fetch_one("SELECT password, role FROM users WHERE username = ?", (username,))
+
+    def list_users(self):
+        return self.fetch("SELECT username, role FROM users ORDER BY username")
+
+    def add_user(self, username, password, role):
+        self.insert("users", {"username": username, "password": password, "role": role})
+
+    def delete_user(self, username):
+        self.execute("DELETE FROM users WHERE username = ?", (username,))
+
+    # --- Inventory ---
+    def get_item_status(self, item_code, slot):
+        row = self.fetch_one("SELECT status FROM inventory WHERE item_code = ? AND slot = ?", (item_code, slot))
+        return row["status"] if row else None
+
+    def oldest_in_stock_slot(self, item_code):
+        row = self.fetch_one(
+            "SELECT slot FROM inventory WHERE item_code = ? AND status = 'in_stock' ORDER BY added_at LIMIT 1",
+            (item_code,),
+        )
+        return row["slot"] if row else None
+
+    def list_item_slots(self, item_code):
+        return self.fetch("SELECT slot, status FROM inventory WHERE item_code = ?", (item_code,))
+
+    def list_inventory(self):
+        return self.fetch(f"SELECT {INVENTORY_COLUMNS} FROM inventory ORDER BY item_code, slot")
+
+    def search_in_stock_labels(self, text, limit=20):
+        item, slot_prefix = split_label_query(text)
+        if slot_prefix is None:
+            rows = self.fetch(
+                """
+                SELECT item_code, slot FROM inventory
+                WHERE status = 'in_stock' AND item_code LIKE ? ESCAPE '\\'
+                ORDER BY item_code, slot LIMIT ?
+                """,
+                (f"{escape_like(item)}%", limit),
+            )
+        else:
+            rows = self.fetch(
+                """
+                SELECT item_code, slot FROM inventory
+                WHERE status = 'in_stock' AND item_code LIKE ? ESCAPE '\\' AND CAST(slot AS TEXT) LIKE ?
+                ORDER BY slot LIMIT ?
+                """,
+                (escape_like(item), f"{slot_prefix}%", limit),
+            )
+        return [f"{row['item_code']}_{row['slot']}" for row in rows]
+
+    def add_inventory_item(self, row, request_id=None):
+        with self.connection() as conn, conn:
+            seen = self.seen_requests(conn, [request_id])
+            if request_id in seen:
+                return seen[request_id]
+            conn.execute(f"INSERT INTO inventory ({', '.join(row)}) VALUES ({', '.join('?' * len(row))})", tuple(row.values()))
+            self.record_requests(conn, [(request_id, True)])
+        return True
+
+    def update_inventory_item(self, item_code, slot, fields):
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        self.execute(
+            f"UPDATE inventory SET {assignments} WHERE item_code = ? AND slot = ?",
+            (*fields.values(), item_code, slot),
+        )
+
+    def update_inventory_statuses(self, units, new_status, expected_status, request_ids=None):
+        check_transition(new_status, expected_status)
+        if not units:
+            return []
+        request_ids = request_ids or [None] * len(units)
+        column = STATUS_TIMESTAMPS[new_status]
+        with self.connection() as conn, conn:
+            seen = self.seen_requests(conn, request_ids)
+            fresh = [(unit, request_id) for unit, request_id in zip(units, request_ids) if request_id not in seen]
+            updated = set()
+            if fresh:
+                values = ", ".join("(?, ?, ?)" for _ in fresh)
+                updated = {
+                    (row["item_code"], row["slot"])
+                    for row in conn.execute(
+                        f"""
+                        UPDATE inventory SET status = ?, {column} = batch.changed_at
+                        FROM (SELECT column1 AS item_code, column2 AS slot, column3 AS changed_at FROM (VALUES {values})) AS batch
+                        WHERE inventory.item_code = batch.item_code AND inventory.slot = batch.slot AND inventory.status = ?
+                        RETURNING inventory.item_code, inventory.slot
+                        """,
+                        (new_status, *(value for unit, _ in fresh for value in unit), expected_status),
+                    )
+                }
+            self.record_requests(conn, [(request_id, tuple(unit[:2]) in updated) for unit, request_id in fresh])
+        repeated = [tuple(unit[:2]) for unit, request_id in zip(units, request_ids) if seen.get(request_id)]
+        return list(updated) + repeated
+
+    def seen_requests(self, conn, request_ids):
+        """{request_id: applied} for those of `request_ids` already recorded in scan_requests."""
+        request_ids = [request_id for request_id in request_ids if request_id is not None]
+        if not request_ids:
+            return {}
+        placeholders = ", ".join("?" * len(request_ids))
+        return {
+            row["request_id"]: bool(row["applied"])
+            for row in conn.execute(f"SELECT request_id, applied FROM scan_requests WHERE request_id IN ({placeholders})", request_ids)
+        }
+
+    def record_requests(self, conn, outcomes):
+        """Records [(request_id, applied)] in scan_requests, skipping writes made without a request id."""
+        now = datetime.datetime.now().isoformat()
+        conn.executemany(
+            "INSERT OR IGNORE INTO scan_requests (request_id, applied, created_at) VALUES (?, ?, ?)",
+            [(request_id, int(applied), now) for request_id, applied in outcomes if request_id is not None],
+        )
+
+    def clear_inventory(self):
+        self.execute("DELETE FROM inventory")
+
+    def archive_depleted(self, cutoff, batch_size):
+        with self.connection() as conn, conn:
+            ids = [
+                row["id"]
+                for row in conn.execute(
+                    "SELECT id FROM inventory WHERE status = 'depleted' AND depleted_at < ? ORDER BY id LIMIT ?",
+                    (cutoff, batch_size),
+                )
+            ]
+            if not ids:
+                return 0
+            placeholders = ", ".join("?" * len(ids))
+            conn.execute(
+                f"""
+                INSERT INTO inventory_history ({ARCHIVED_COLUMNS}, archived_at)
+                SELECT {ARCHIVED_COLUMNS}, ? FROM inventory WHERE id IN ({placeholders})
+                """,
+                (datetime.datetime.now().isoformat(), *ids),
+            )
+            conn.execute(f"DELETE FROM inventory WHERE id IN ({placeholders})", ids)
+        return len(ids)
+
+    def list_depletions(self, since=None):
+        # '' sorts before every timestamp and never matches NULL
+        return self.fetch(
+            """
+            SELECT item_code, in_use_at, depleted_at FROM inventory WHERE depleted_at >= ?
+            UNION ALL
+            SELECT item_code, in_use_at, depleted_at FROM inventory_history WHERE depleted_at >= ?
+            """,
+            (since or "", since or ""),
+        )
+
+    def latest_depletion_at(self):
+        return self.fetch_one("""
+            SELECT MAX(newest) AS newest FROM (
+                SELECT MAX(depleted_at) AS newest FROM inventory
+                UNION ALL
+                SELECT MAX(depleted_at) FROM inventory_history
+            )
+        """)["newest"]
+
+    def list_truck_receivers(self, truck_id):
+        rows = self.fetch(
+            "SELECT DISTINCT added_by FROM inventory WHERE truck_id = ? AND status = 'in_stock' ORDER BY added_by",
+            (truck_id,),
+        )
+        return [row["added_by"] for row in rows]
+
+    # --- Trucks ---
+    def search_trucks(self, closed=None, created_from=None, created_before=None, name_prefix=None, limit=20, offset=0):
+        conditions, params = [], []
+        if closed is True:
+            conditions.append("status = 'closed'")
+        elif closed is False:
+            conditions.append("status != 'closed'")
+        if created_from:
+            conditions.append("created_at >= ?")
+            params.append(created_from)
+        if created_before:
+            conditions.append("created_at < ?")
+            params.append(created_before)
+        if name_prefix:
+            # LIKE ignores ASCII case in SQLite, matching ilike on Postgres
+            conditions.append("truck_name LIKE ? ESCAPE '\\'")
+            params.append(f"{escape_like(name_prefix)}%")
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return self.fetch(
+            f"SELECT {TRUCK_COLUMNS} FROM anticipated_trucks {where} ORDER BY created_at DESC LIMIT ? OFFSET ?",
+            (*params, limit, offset),
+        )
+
+    def get_truck_names(self, truck_ids):
+        if not truck_ids:
+            return {}
+        placeholders = ", ".join("?" * len(truck_ids))
+        rows = self.fetch(f"SELECT id, truck_name FROM anticipated_trucks WHERE id IN ({placeholders})", tuple(truck_ids))
+        return {row["id"]: row["truck_name"] for row in rows}
+
+    def create_truck(self, row):
+        return self.insert("anticipated_trucks", row)
+
+    def close_truck(self, truck_id, closed_by, closed_at):
+        with self.connection() as conn, conn:
+            # Closing first makes a concurrent second close fail instead of recording twice
+            closed = conn.execute(
+                "UPDATE anticipated_trucks SET status = 'closed' WHERE id = ? AND status IS NOT 'closed'",
+                (truck_id,),
+            ).rowcount
+            if not closed:
+                if conn.execute("SELECT 1 FROM anticipated_trucks WHERE id = ?", (truck_id,)).fetchone():
+                    raise ValueError(f"Truck {truck_id} is already closed")
+                raise ValueError(f"Truck {truck_id} does not exist")
+
+            conn.execute("UPDATE anticipated_items SET status = 'missing' WHERE truck_id = ? AND status = 'pending'", (truck_id,))
+            summary = dict(conn.execute(
+                """
+                SELECT COUNT(CASE WHEN status = 'scanned' THEN 1 END) AS items_processed,
+                       COUNT(CASE WHEN status = 'missing' THEN 1 END) AS items_missing,
+                       COUNT(*) AS total_items
+                FROM anticipated_items WHERE truck_id = ?
+                """,
+                (truck_id,),
+            ).fetchone())
+            conn.execute(
+                """
+                INSERT INTO analytics_history (truck_id, closed_by, closed_at, items_processed, items_missing, total_items)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (truck_id, closed_by, closed_at, summary["items_processed"], summary["items_missing"], summary["total_items"]),
+            )
+        return {**summary, "closed_at": closed_at}
+
+    def delete_truck(self, truck_id):
+        with self.connection() as conn, conn:
+            conn.execute("DELETE FROM analytics_history WHERE truck_id = ?", (truck_id,))
+            conn.execute("DELETE FROM inventory WHERE truck_id = ?", (truck_id,))
+            conn.execute("DELETE FROM inventory_history WHERE truck_id = ?", (truck_id,))
+            conn.execute("DELETE FROM anticipated_items WHERE truck_id = ?", (truck_id,))
+            conn.execute("DELETE FROM anticipated_item_counts WHERE truck_id = ?", (truck_id,))
+            conn.execute("DELETE FROM anticipated_trucks WHERE id = ?", (truck_id,))
+
+    # --- Anticipated items ---
+    def list_anticipated_items(self, truck_id):
+        return self.fetch("SELECT * FROM anticipated_items WHERE truck_id = ?", (truck_id,))
+
+    def list_anticipated_slots(self, item_code):
+        return [row["slot"] for row in self.fetch("SELECT slot FROM anticipated_items WHERE item_code = ?", (item_code,))]
+
+    def list_pending_items(self, truck_id):
+        return self.fetch(
+            "SELECT id, item_code, slot, barcode_label FROM anticipated_items WHERE truck_id = ? AND status = 'pending'",
+            (truck_id,),
+        )
+
+    def receive_items(self, truck_id, item_ids, received_by, received_at, request_ids=None):
+        if not item_ids:
+            return []
+        request_ids = request_ids or [None] * len(item_ids)
+        with self.connection() as conn, conn:
+            seen = self.seen_requests(conn, request_ids)
+            fresh = [(item_id, request_id) for item_id, request_id in zip(item_ids, request_ids) if request_id not in seen]
+            received = []
+            if fresh:
+                placeholders = ", ".join("?" * len(fresh))
+                received = conn.execute(
+                    f"""
+                    UPDATE anticipated_items SET status = 'scanned', scanned_at = ?
+                    WHERE truck_id = ? AND status = 'pending' AND id IN ({placeholders})
+                    RETURNING id, item_code, slot
+                    """,
+                    (received_at, truck_id, *(item_id for item_id, _ in fresh)),
+                ).fetchall()
+                conn.executemany(
+                    """
+                    INSERT INTO inventory (item_code, slot, status, added_by, added_at, in_stock_at, truck_id)
+                    VALUES (?, ?, 'in_stock', ?, ?, ?, ?)
+                    """,
+                    [(row["item_code"], row["slot"], received_by, received_at, received_at, truck_id) for row in received],
+                )
+            received_ids = {row["id"] for row in received}
+            self.record_requests(conn, [(request_id, item_id in received_ids) for item_id, request_id in fresh])
+        repeated = [item_id for item_id, request_id in zip(item_ids, request_ids) if seen.get(request_id)]
+        return [row["id"] for row in received] + repeated
+
+    def prune_scan_requests(self, cutoff):
+        with self.connection() as conn, conn:
+            return conn.execute("DELETE FROM scan_requests WHERE created_at < ?", (cutoff,)).rowcount
+
+    def add_anticipated_items(self, rows):
+        if not rows:
+            return
+        columns = list(rows[0])
+        with self.connection() as conn, conn:
+            conn.executemany(
+                f"INSERT INTO anticipated_items ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                [tuple(row[c] for c in columns) for row in rows],
+            )
+
+    def count_truck_items(self, truck_id):
+        return self.fetch("SELECT item_code, status, item_count FROM truck_item_status_counts WHERE truck_id = ?", (truck_id,))
+
+    def compact_closed_trucks(self, prune=False):
+        with self.connection() as conn, conn:
+            truck_ids = [row["id"] for row in conn.execute("SELECT id FROM anticipated_trucks WHERE status = 'closed' AND compacted_at IS NULL")]
+            if truck_ids:
+                placeholders = ", ".join("?" * len(truck_ids))
+                conn.execute(
+                    f"""
+                    INSERT OR REPLACE INTO anticipated_item_counts (truck_id, item_code, status, item_count)
+                    SELECT truck_id, item_code, status, COUNT(*) FROM anticipated_items
+                    WHERE truck_id IN ({placeholders})
+                    GROUP BY truck_id, item_code, status
+                    """,
+                    truck_ids,
+                )
+                conn.execute(
+                    f"UPDATE anticipated_trucks SET compacted_at = ? WHERE id IN ({placeholders})",
+                    (datetime.datetime.now().isoformat(), *truck_ids),
+                )
+            if prune:
+                conn.execute("DELETE FROM anticipated_items WHERE truck_id IN (SELECT id FROM anticipated_trucks WHERE compacted_at IS NOT NULL)")
+        return len(truck_ids)
+
+    # --- Analytics history ---
+    def list_truck_closures(self):
+        return self.fetch("SELECT truck_id, closed_at FROM analytics_history ORDER BY closed_at")
+
+    def get_truck_closure(self, truck_id):
+        return self.fetch_one("SELECT closed_by, closed_at FROM analytics_history WHERE truck_id = ?", (truck_id,))
+
+    # --- Notifications ---
+    def get_notification(self, section):
+        return self.fetch_one(
+            "SELECT message, sender FROM notifications WHERE section = ? ORDER BY created_at DESC, id DESC LIMIT 1",
+            (section,),
+        )
+
+    def list_notifications(self):
+        return self.fetch("SELECT id, section, message, sender, created_at FROM notifications ORDER BY created_at DESC, id DESC")
+
+    def replace_notification(self, section, message, sender):
+        with self.connection() as conn, conn:
+            conn.execute("DELETE FROM notifications WHERE section = ?", (section,))
+            conn.execute(
+                "INSERT INTO notifications (section, message, sender, created_at) VALUES (?, ?, ?, ?)",
+                (section, message, sender, datetime.datetime.now().isoformat()),
+            )
+
+    def delete_notification(self, notification_id):
+        self.execute("DELETE FROM notifications WHERE id = ?", (notification_id,))
+
+    # --- Cache validation ---
+    def data_versions(self):
+        return {row["table_name"]: row["version"] for row in self.fetch("SELECT table_name, version FROM data_versions")}
+
+
+class MirroredRepository(Repository):
+    """Writes, scan-path reads and depletion history go to Supabase; bulk reads come from a local SQLite mirror.
+
+    `mirror` is a started `SQLiteMirror`. Mirrored reads refresh it first
+    when it is older than its staleness bound, and every write marks it
+    stale so the next read catches up.
+
+    When Supabase cannot be reached, the Supabase reads are answered from the
+    mirror as a snapshot instead, and Supabase is only tried again every
+    `retry_interval` seconds so scans do not wait on a timeout each time.
+    `offline_since` is set while that is happening.
+    """
+
+    def __init__(self, primary, mirror, retry_interval=15):
+        self.primary = primary
+        self.mirror = mirror
+        self.local = SQLiteRepository(mirror.db_name)
+        self.retry_interval = retry_interval
+        self.offline_since = None
+        self._offline_checked_at = None
+
+    def read_local(self):
+        self.mirror.ensure_fresh()
+        return self.local
+
+    def read_primary(self, method, *args):
+        """Calls a read on Supabase, or on the mirror snapshot while offline.
+
+        Raises ConnectionError while offline if the mirror has no snapshot yet.
+        """
+        if self.offline_since is None or time.monotonic() - self._offline_checked_at >= self.retry_interval:
+            try:
+                result = getattr(self.primary, method)(*args)
+            except Exception as e:
+                if not is_connection_error(e):
+                    raise
+                self._offline_checked_at = time.monotonic()
+                if self.offline_since is None:
+                    self.offline_since = self._offline_checked_at
+            else:
+                self.offline_since = None
+                return result
+        if self.mirror.synced_at is None:
+            # An empty mirror would answer "not found" for everything
+            raise ConnectionError("Supabase cannot be reached and the local mirror has not synced yet")
+        return getattr(self.local, method)(*args)
+
+    def written(self, result=None):
+        self.mirror.mark_stale()
+        return result
+
+    # --- Allowed items ---
+    def list_allowed_items(self):
+        return self.read_local().list_allowed_items()
+
+    def is_allowed_item(self, item_name):
+        return self.read_primary("is_allowed_item", item_name)
+
+    def add_allowed_item(self, item_name):
+        return self.written(self.primary.add_allowed_item(item_name))
+
+    def delete_allowed_items(self, item_names):
+        return self.written(self.primary.delete_allowed_items(item_names))
+
+    # --- Users (never mirrored) ---
+    def get_user(self, username):
+        return self.primary.get_user(username)
+
+    def list_users(self):
+        return self.primary.list_users()
+
+    def add_user(self, username, password, role):
+        return self.written(self.primary.add_user(username, password, role))
+
+    def delete_user(self, username):
+        return self.written(self.primary.delete_user(username))
+
+    # --- Inventory ---
+    def get_item_status(self, item_code, slot):
+        return self.read_primary("get_item_status", item_code, slot)
+
+    def oldest_in_stock_slot(self, item_code):
+        return self.read_primary("oldest_in_stock_slot", item_code)
+
+    def list_item_slots(self, item_code):
+        return self.primary.list_item_slots(item_code)
+
+    def list_inventory(self):
+        return self.read_local().list_inventory()
+
+    def search_in_stock_labels(self, text, limit=20):
+        return self.read_local().search_in_stock_labels(text, limit)
+
+    def add_inventory_item(self, row, request_id=None):
+        return self.written(self.primary.add_inventory_item(row, request_id))
+
+    def update_inventory_item(self, item_code, slot, fields):
+        return self.written(self.primary.update_inventory_item(item_code, slot, fields))
+
+    def update_inventory_statuses(self, units, new_status, expected_status, request_ids=None):
+        return self.written(self.primary.update_inventory_statuses(units, new_status, expected_status, request_ids))
+
+    def clear_inventory(self):
+        return self.written(self.primary.clear_inventory())
+
+    def archive_depleted(self, cutoff, batch_size):
+        return self.written(self.primary.archive_depleted(cutoff, batch_size))
+
+    # inventory_history is not mirrored (see mirror.MIRRORED_TABLES)
+    def list_depletions(self, since=None):
+        return self.read_primary("list_depletions", since)
+
+    def latest_depletion_at(self):
+        return self.read_primary("latest_depletion_at")
+
+    def list_truck_receivers(self, truck_id):
+        return self.read_local().list_truck_receivers(truck_id)
+
+    # --- Trucks ---
+    def search_trucks(self, closed=None, created_from=None, created_before=None, name_prefix=None, limit=20, offset=0):
+        return self.read_local().search_trucks(closed, created_from, created_before, name_prefix, limit, offset)
+
+    def get_truck_names(self, truck_ids):
+        return self.read_local().get_truck_names(truck_ids)
+
+    def create_truck(self, row):
+        return self.written(self.primary.create_truck(row))
+
+    def close_truck(self, truck_id, closed_by, closed_at):
+        return self.written(self.primary.close_truck(truck_id, closed_by, closed_at))
+
+    def delete_truck(self, truck_id):
+        return self.written(self.primary.delete_truck(truck_id))
+
+    # --- Anticipated items ---
+    def list_anticipated_items(self, truck_id):
+        return self.read_local().list_anticipated_items(truck_id)
+
+    def list_anticipated_slots(self, item_code):
+        return self.primary.list_anticipated_slots(item_code)
+
+    def list_pending_items(self, truck_id):
+        return self.read_primary("list_pending_items", truck_id)
+
+    def receive_items(self, truck_id, item_ids, received_by, received_at, request_ids=None):
+        return self.written(self.primary.receive_items(truck_id, item_ids, received_by, received_at, request_ids))
+
+    def prune_scan_requests(self, cutoff):
+        return self.primary.prune_scan_requests(cutoff)
+
+    def add_anticipated_items(self, rows):
+        return self.written(self.primary.add_anticipated_items(rows))
+
+    def count_truck_items(self, truck_id):
+        return self.read_local().count_truck_items(truck_id)
+
+    def compact_closed_trucks(self, prune=False):
+        return self.written(self.primary.compact_closed_trucks(prune))
+
+    # --- Analytics history ---
+    def list_truck_closures(self):
+        return self.read_local().list_truck_closures()
+
+    def get_truck_closure(self, truck_id):
+        return self.read_local().get_truck_closure(truck_id)
+
+    # --- Notifications (never mirrored, so none are shown while offline) ---
+    def get_notification(self, section):
+        return self.read_primary("get_notification", section)
+
+    def list_notifications(self):
+        return self.primary.list_notifications()
+
+    def replace_notification(self, section, message, sender):
+        return self.written(self.primary.replace_notification(section, message, sender))
+
+    def delete_notification(self, notification_id):
+        return self.written(self.primary.delete_notification(notification_id))
+
+    # --- Cache validation ---
+    def data_versions(self):
+        # Versions of the data as the mirror holds it, so caches keyed on
+        # them never pin rows the mirror has not caught up with yet
+        self.mirror.ensure_fresh()
+        return dict(self.mirror.versions)
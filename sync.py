@@ -0,0 +1,88 @@
+# sync.py
+import datetime
+
+# Tables that carry an `updated_at` column and record deletes in `deleted_rows`
+# (see migrations/postgres/002_delta_sync.sql)
+SYNCED_TABLES = ("inventory", "anticipated_items")
+
+# Re-read this much history on every sync so rows committed by a slow
+# transaction with an earlier `updated_at` are not skipped.
+SYNC_OVERLAP = datetime.timedelta(seconds=5)
+
+# Tombstones older than this are pruned server-side; a watermark older than
+# this can no longer see every delete and needs a full resync.
+TOMBSTONE_RETENTION = datetime.timedelta(days=30)
+
+
+def fetch_all_rows(build_query, page_size=1000):
+    """Runs a query page by page so results are not cut off at the API row limit.
+
+    `build_query` must return a fresh query builder on every call, since
+    Supabase builders keep their range parameters once applied.
+    """
+    rows = []
+    start = 0
+    while True:
+        page = build_query().range(start, start + page_size - 1).execute().data
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+        start += page_size
+
+
+def fetch_changes(client, table, since=None, columns="*"):
+    """Returns the rows of `table` changed since the `since` watermark.
+
+    The result is a dict with:
+      - rows: inserted or updated rows (always including `id` and `updated_at`)
+      - deleted: ids of rows deleted since the watermark
+      - full: True when `rows` is the whole table and the caller should
+        replace its copy instead of merging (no or expired watermark)
+      - watermark: value to pass as `since` on the next call
+    """
+    if table not in SYNCED_TABLES:
+        raise ValueError(f"{table} is not set up for delta sync")
+
+    if columns != "*":
+        columns = f"id, updated_at, {columns}"
+
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cutoff = parse_watermark(since)
+    full = cutoff is None or now - cutoff > TOMBSTONE_RETENTION
+
+    if full:
+        # Supabase: Full snapshot
+        rows = fetch_all_rows(lambda: client.from_(table).select(columns).order("id"))
+        deleted = []
+    else:
+        start = (cutoff - SYNC_OVERLAP).isoformat()
+        # Supabase: Rows touched since the watermark, plus tombstones for deletes
+        rows = fetch_all_rows(lambda: client.from_(table).select(columns).gte("updated_at", start).order("id"))
+        tombstones = fetch_all_rows(
+            lambda: client.from_("deleted_rows").select("row_id").eq("table_name", table).gte("deleted_at", start).order("row_id")
+        )
+        deleted = [row["row_id"] for row in tombstones]
+
+    # Never move the watermark past what the server has shown us
+    seen = [parse_watermark(row["updated_at"]) for row in rows if row.get("updated_at")]
+    watermark = max(seen + ([cutoff] if cutoff else []), default=None)
+
+    return {
+        "rows": rows,
+        "deleted": deleted,
+        "full": full,
+        "watermark": watermark.isoformat() if watermark else None,
+    }
+
+
+def parse_watermark(value):
+    if value is None:
+        return None
+    if isinstance(value, datetime.datetime):
+        parsed = value
+    else:
+        parsed = datetime.datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed
+
@@ -0,0 +1,301 @@
+# write_queue.py
+import collections
+import datetime
+import itertools
+import logging
+import threading
+import time
+import uuid
+
+from local_db import ConnectionPool
+from repository import check_transition, is_connection_error
+
+logger = logging.getLogger(__name__)
+
+QUEUE_DB_NAME = "scan_queue.db"
+
+# A journal entry is a User Mode status change (kind "status") or a Truck
+# Mode receive (kind "receive": the anticipated item goes from pending to an
+# in_stock inventory unit). `client_id` is the scan's request id, made on
+# the station when the scan is made, so an entry keeps one identity however
+# often it is replayed; the backend records it as an idempotency key.
+QUEUE_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS scan_queue (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        client_id TEXT,
+        kind TEXT NOT NULL DEFAULT 'status',
+        item_code TEXT NOT NULL,
+        slot INTEGER NOT NULL,
+        new_status TEXT NOT NULL,
+        expected_status TEXT NOT NULL,
+        changed_at TEXT NOT NULL,
+        truck_id INTEGER,
+        item_id INTEGER,
+        received_by TEXT,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        last_error TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS scan_queue_rejected (
+        id INTEGER PRIMARY KEY,
+        client_id TEXT,
+        kind TEXT NOT NULL DEFAULT 'status',
+        item_code TEXT NOT NULL,
+        slot INTEGER NOT NULL,
+        new_status TEXT NOT NULL,
+        expected_status TEXT NOT NULL,
+        changed_at TEXT NOT NULL,
+        truck_id INTEGER,
+        item_id INTEGER,
+        received_by TEXT,
+        reason TEXT,
+        rejected_at TEXT NOT NULL
+    )
+    """,
+)
+
+QUEUE_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS scan_queue_unit_idx ON scan_queue (item_code, slot)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS scan_queue_client_id_idx ON scan_queue (client_id)",
+    "CREATE INDEX IF NOT EXISTS scan_queue_truck_idx ON scan_queue (truck_id)",
+)
+
+
+def batch_key(row):
+    """Consecutive entries with the same key are replayed in one backend call."""
+    if row["kind"] == "receive":
+        return ("receive", row["truck_id"], row["received_by"], row["changed_at"])
+    return ("status", row["new_status"], row["expected_status"])
+
+
+class WriteBehindQueue:
+    """Durable local journal of scans, replayed to the backend in the background.
+
+    `enqueue` and `enqueue_statuses` (User Mode status changes) and
+    `enqueue_receive` (Truck Mode receives) commit to a local SQLite journal
+    (synchronous=FULL, so it survives a power cut) and return without
+    waiting on the network, which lets a station keep scanning while the
+    backend is unreachable.
+
+    A background thread replays the journal in id order, up to `batch_size`
+    entries at a time; consecutive entries of the same kind go out as one
+    `update_inventory_statuses` or `receive_items` call. Both are
+    compare-and-set, so an entry whose unit was changed or received on
+    another station in the meantime is a conflict: it is moved to
+    scan_queue_rejected instead of overwriting the other station. When the
+    backend cannot be reached the call is retried with backoff and nothing
+    queued behind it is sent first, so changes land in the order they were
+    made. Calls carry the entries' client ids as request ids, so a retry
+    after a lost response gets the first outcome back instead of a
+    conflict.
+    """
+
+    def __init__(self, repo, db_name=QUEUE_DB_NAME, flush_interval=1.0, batch_size=50, max_backoff=60):
+        self.repo = repo
+        self.db_name = db_name
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_backoff = max_backoff
+        self.flushed_at = None
+        self.last_error = None
+        # True while replay is failing because the backend cannot be reached
+        self.offline = False
+        # Seconds per backend call, most recent last
+        self.flush_latencies = collections.deque(maxlen=50)
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        # The journal is the only copy of a change until it is flushed
+        self.pool = ConnectionPool(db_name, pragmas={"synchronous": "FULL"})
+
+        with self.pool.connection() as conn, conn:
+            for statement in QUEUE_SCHEMA:
+                conn.execute(statement)
+            for statement in QUEUE_INDEXES:
+                conn.execute(statement)
+
+    def start(self):
+        """Starts the background flush thread (once)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="scan-write-queue", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        backoff = 0
+        while True:
+            if backoff:
+                time.sleep(backoff)
+            else:
+                # New changes wake the thread straight away
+                self._wake.wait(self.flush_interval)
+                self._wake.clear()
+            try:
+                self.flush()
+                backoff = 0
+            except Exception:
+                logger.exception("Scan queue flush failed")
+                backoff = min(max(backoff * 2, self.flush_interval), self.max_backoff)
+
+    def enqueue(self, item_code, slot, new_status, expected_status, changed_at, client_id=None):
+        """Journals one compare-and-set status change and returns its client id at once.
+
+        An entry whose `client_id` is already queued is not added again.
+        """
+        return self.enqueue_statuses([(item_code, slot, changed_at)], new_status, expected_status, [client_id])[0]
+
+    def enqueue_statuses(self, units, new_status, expected_status, client_ids=None):
+        """Journals moving [(item_code, slot, changed_at)] to `new_status` in one commit; returns their client ids.
+
+        The bulk form of `enqueue`, for User Mode bulk updates.
+        """
+        check_transition(new_status, expected_status)
+        client_ids = [client_id or uuid.uuid4().hex for client_id in client_ids or [None] * len(units)]
+        with self.pool.connection() as conn, conn:
+            conn.executemany(
+                """
+                INSERT OR IGNORE INTO scan_queue (client_id, kind, item_code, slot, new_status, expected_status, changed_at)
+                VALUES (?, 'status', ?, ?, ?, ?, ?)
+                """,
+                [
+                    (client_id, item_code, slot, new_status, expected_status, changed_at)
+                    for client_id, (item_code, slot, changed_at) in zip(client_ids, units)
+                ],
+            )
+        self._wake.set()
+        return client_ids
+
+    def enqueue_receive(self, truck_id, items, received_by, received_at, client_ids=None):
+        """Journals receiving [(anticipated id, item_code, slot)] off a truck; returns their client ids."""
+        client_ids = client_ids or [uuid.uuid4().hex for _ in items]
+        with self.pool.connection() as conn, conn:
+            conn.executemany(
+                """
+                INSERT OR IGNORE INTO scan_queue (client_id, kind, truck_id, item_id, item_code, slot, new_status, expected_status, changed_at, received_by)
+                VALUES (?, 'receive', ?, ?, ?, ?, 'in_stock', 'pending', ?, ?)
+                """,
+                [
+                    (client_id, truck_id, item_id, item_code, slot, received_at, received_by)
+                    for client_id, (item_id, item_code, slot) in zip(client_ids, items)
+                ],
+            )
+        self._wake.set()
+        return client_ids
+
+    def pending_status(self, item_code, slot):
+        """The status the unit will have once its queued entries replay, or None if none are queued.
+
+        A queued receive counts as in_stock, so a unit received while
+        offline can be scanned in User Mode straight away.
+        """
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                "SELECT new_status FROM scan_queue WHERE item_code = ? AND slot = ? ORDER BY id DESC LIMIT 1",
+                (item_code, slot),
+            ).fetchone()
+        return row["new_status"] if row else None
+
+    def queued_receives(self, truck_id):
+        """Anticipated item ids of the truck that are received locally but not replayed yet."""
+        with self.pool.connection() as conn:
+            return {
+                row["item_id"]
+                for row in conn.execute("SELECT item_id FROM scan_queue WHERE kind = 'receive' AND truck_id = ?", (truck_id,))
+            }
+
+    def flush(self):
+        """Sends queued changes in order until the queue is empty; returns how many were sent."""
+        sent = 0
+        with self._lock, self.pool.connection() as conn:
+            while True:
+                rows = conn.execute("SELECT * FROM scan_queue ORDER BY id LIMIT ?", (self.batch_size,)).fetchall()
+                if not rows:
+                    return sent
+                for _, run in itertools.groupby(rows, key=batch_key):
+                    run = list(run)
+                    self._send(conn, run)
+                    sent += len(run)
+
+    def _send(self, conn, run):
+        started = time.monotonic()
+        try:
+            applied = self._replay(run)
+        except Exception as e:
+            self.last_error = str(e)
+            self.offline = is_connection_error(e)
+            if self.offline:
+                # Retried from this entry on, so nothing overtakes it
+                with conn:
+                    conn.execute("UPDATE scan_queue SET attempts = attempts + 1, last_error = ? WHERE id = ?", (str(e), run[0]["id"]))
+                raise
+            # The backend refused the call itself; find the entries at fault one by one
+            if len(run) > 1:
+                for row in run:
+                    self._send(conn, [row])
+                return
+            applied, reason = set(), str(e)
+        else:
+            self.flush_latencies.append(time.monotonic() - started)
+            self.flushed_at = time.monotonic()
+            self.last_error = None
+            self.offline = False
+            if run[0]["kind"] == "receive":
+                reason = "no longer pending: received on another station or removed from the truck"
+            else:
+                reason = f"no longer {run[0]['expected_status']}: changed on another station"
+
+        now = datetime.datetime.now().isoformat()
+        rejected = [row for row in run if row["id"] not in applied]
+        columns = ["id", "client_id", "kind", "truck_id", "item_id", "item_code", "slot", "new_status", "expected_status", "changed_at", "received_by"]
+        with conn:
+            conn.executemany(
+                f"""
+                INSERT OR REPLACE INTO scan_queue_rejected ({", ".join(columns)}, reason, rejected_at)
+                VALUES ({", ".join("?" * len(columns))}, ?, ?)
+                """,
+                [tuple(row[c] for c in columns) + (reason, now) for row in rejected],
+            )
+            placeholders = ", ".join("?" * len(run))
+            conn.execute(f"DELETE FROM scan_queue WHERE id IN ({placeholders})", [row["id"] for row in run])
+
+    def _replay(self, run):
+        """Sends a run of same-key entries in one call; returns the journal ids the backend applied."""
+        first = run[0]
+        if first["kind"] == "receive":
+            received = set(self.repo.receive_items(
+                first["truck_id"], [row["item_id"] for row in run], first["received_by"], first["changed_at"],
+                [row["client_id"] for row in run],
+            ))
+            return {row["id"] for row in run if row["item_id"] in received}
+        units = [(row["item_code"], row["slot"], row["changed_at"]) for row in run]
+        updated = set(self.repo.update_inventory_statuses(units, first["new_status"], first["expected_status"], [row["client_id"] for row in run]))
+        return {row["id"] for row in run if (row["item_code"], row["slot"]) in updated}
+
+    def list_rejected(self, limit=20):
+        with self.pool.connection() as conn:
+            return [dict(row) for row in conn.execute("SELECT * FROM scan_queue_rejected ORDER BY id DESC LIMIT ?", (limit,))]
+
+    def clear_rejected(self):
+        with self.pool.connection() as conn, conn:
+            conn.execute("DELETE FROM scan_queue_rejected")
+
+    def stats(self):
+        """Queue depth, age of the oldest change, flush latency (seconds) and rejected count."""
+        with self.pool.connection() as conn:
+            depth, oldest, attempts = conn.execute("SELECT COUNT(*), MIN(changed_at), MAX(attempts) FROM scan_queue").fetchone()
+            rejected = conn.execute("SELECT COUNT(*) FROM scan_queue_rejected").fetchone()[0]
+        latencies = list(self.flush_latencies)
+        return {
+            "depth": depth,
+            "oldest_age": (datetime.datetime.now() - datetime.datetime.fromisoformat(oldest)).total_seconds() if oldest else None,
+            "attempts": attempts or 0,
+            "last_latency": latencies[-1] if latencies else None,
+            "avg_latency": sum(latencies) / len(latencies) if latencies else None,
+            "max_latency": max(latencies) if latencies else None,
+            "since_flush": time.monotonic() - self.flushed_at if self.flushed_at is not None else None,
+            "rejected": rejected,
+            "last_error": self.last_error,
+            "offline": self.offline,
+        }